@@ -6,10 +6,55 @@ Compiles C library and builds Python wheels for local development.
 """
 
 import argparse
+import hashlib
+import importlib.util
 import os
 import subprocess
 import sys
 from pathlib import Path
+from typing import Iterable, Optional
+
+SRC_DIR = Path(__file__).parent.parent / "src"
+
+# Stamp files recording the inputs of the last dependency install and wheel
+# build, used to skip those steps when nothing changed
+DEPS_HASH_FILE = Path(sys.prefix) / ".audiostretchy-deps-hash"
+WHEEL_HASH_FILE = Path(".hatch-build-hash")
+
+# build.py only uses the standard library. Loading it by path rather than
+# through the package keeps this script working before the package's
+# dependencies are installed.
+_build_spec = importlib.util.spec_from_file_location(
+    "_audiostretchy_build", SRC_DIR / "audiostretchy" / "c_interface" / "build.py"
+)
+_build = importlib.util.module_from_spec(_build_spec)
+_build_spec.loader.exec_module(_build)
+_run_streamed = _build._run_streamed
+
+
+def _hash_files(paths: Iterable[Path], extra: str = "") -> str:
+    """Compute a SHA-256 digest over the names and contents of files."""
+    digest = hashlib.sha256(extra.encode())
+    for path in sorted(paths):
+        digest.update(str(path).encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def _read_stamp(path: Path) -> Optional[str]:
+    """Read a stored input hash, or None if there is none."""
+    try:
+        return path.read_text().strip()
+    except OSError:
+        return None
+
+
+def _write_stamp(path: Path, value: str) -> None:
+    """Store an input hash; failures only mean the step reruns next time."""
+    try:
+        path.write_text(value)
+    except OSError as e:
+        print(f"Could not write {path}: {e}")
 
 
 def setup_environment():
@@ -17,10 +62,16 @@ def setup_environment():
     project_root = Path(__file__).parent.parent
     os.chdir(project_root)
     
-    # Ensure git submodule is initialized
+    # Ensure git submodule is initialized. Only audio-stretch is needed for the
+    # build, and a shallow, blobless fetch skips its history entirely.
     if not (project_root / "audio-stretch" / "stretch.c").exists():
         print("Initializing git submodule...")
-        subprocess.run(["git", "submodule", "update", "--init", "--recursive"], check=True)
+        subprocess.run([
+            "git", "submodule", "update", "--init", "--recursive",
+            "--depth", "1", "--filter=blob:none",
+            "--jobs", str(os.cpu_count() or 4),
+            "--", "audio-stretch",
+        ], check=True)
 
 
 def compile_c_library(force: bool = False):
@@ -28,53 +79,95 @@ def compile_c_library(force: bool = False):
     print("Compiling C library...")
     
     # Import and use the build utility
-    sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+    sys.path.insert(0, str(SRC_DIR))
     from audiostretchy.c_interface.build import AudioStretchBuilder
     
     builder = AudioStretchBuilder()
     lib_path = builder.compile_library(force=force)
     print(f"C library compiled: {lib_path}")
+
+    # The SIMD variant is optional: the wrapper falls back to the generic build
+    if builder.get_compiler_config()["simd_suffix"]:
+        try:
+            simd_path = builder.compile_library(force=force, simd=True)
+            print(f"SIMD C library compiled: {simd_path}")
+        except RuntimeError as e:
+            print(f"Skipping SIMD C library: {e}")
+
+    # The cffi module is optional too: the wrapper falls back to ctypes
+    from audiostretchy.c_interface.build_ffi import build_ffi
+
+    try:
+        module_path = build_ffi(force=force)
+        print(f"cffi module compiled: {module_path}")
+    except ImportError:
+        print("Skipping cffi module: cffi is not installed")
+    except Exception as e:
+        print(f"Skipping cffi module: {e}")
     
     return lib_path
 
 
-def build_wheel():
-    """Build Python wheel using hatch."""
+def build_wheel(force: bool = False):
+    """Build Python wheel using hatch, unless its inputs are unchanged."""
+    # The version comes from git, so the current commit is an input too
+    head = subprocess.run(
+        ["git", "rev-parse", "HEAD"], capture_output=True, text=True
+    ).stdout.strip()
+    package_dir = Path("src") / "audiostretchy"
+    inputs = [Path("pyproject.toml"), Path("README.md")]
+    inputs += [p for p in package_dir.rglob("*.py") if p.name != "_version.py"]
+    for pattern in (
+        "*.c", "_stretch*.so", "_stretch*.dylib", "_stretch*.dll", "_audiostretch_cffi*"
+    ):
+        inputs += package_dir.rglob(pattern)
+    inputs_hash = _hash_files(inputs, extra=head)
+
+    # The stamp names the wheel built from these inputs, which must still exist
+    stamp = (_read_stamp(WHEEL_HASH_FILE) or "").split()
+    if not force and len(stamp) == 2 and stamp[0] == inputs_hash and (
+        Path("dist") / stamp[1]
+    ).exists():
+        print(f"Wheel {stamp[1]} is up to date")
+        return
+
     print("Building Python wheel...")
     
     try:
-        result = subprocess.run(
-            [sys.executable, "-m", "build"],
-            capture_output=True,
-            text=True,
-            check=True
-        )
+        # Build in the current environment rather than a fresh isolated one
+        _run_streamed([sys.executable, "-m", "build", "--wheel", "--no-isolation"])
+        wheel = max(Path("dist").glob("*.whl"), key=lambda p: p.stat().st_mtime)
+        _write_stamp(WHEEL_HASH_FILE, f"{inputs_hash} {wheel.name}")
         print("Wheel build successful!")
-        if result.stdout:
-            print(result.stdout)
             
     except subprocess.CalledProcessError as e:
         print(f"Wheel build failed: {e}")
-        if e.stdout:
-            print("stdout:", e.stdout)
-        if e.stderr:
-            print("stderr:", e.stderr)
+        if e.output:
+            print(f"Last output lines:\n{e.output}")
         raise
 
 
-def install_dev_dependencies():
-    """Install development dependencies."""
+def install_dev_dependencies(force: bool = False):
+    """Install development dependencies, unless pyproject.toml is unchanged."""
+    deps_hash = _hash_files([Path("pyproject.toml")])
+    if not force and _read_stamp(DEPS_HASH_FILE) == deps_hash:
+        print("Development dependencies are up to date")
+        return
+
     print("Installing development dependencies...")
     
     try:
-        subprocess.run([
+        _run_streamed([
             sys.executable, "-m", "pip", "install", 
             "-e", ".[dev]"
-        ], check=True)
+        ])
+        _write_stamp(DEPS_HASH_FILE, deps_hash)
         print("Development dependencies installed!")
         
     except subprocess.CalledProcessError as e:
         print(f"Failed to install dependencies: {e}")
+        if e.output:
+            print(f"Last output lines:\n{e.output}")
         raise
 
 
@@ -96,7 +189,10 @@ def run_tests():
 def main():
     """Main build script."""
     parser = argparse.ArgumentParser(description="Local build script for AudioStretchy")
-    parser.add_argument("--force", action="store_true", help="Force rebuild of C library")
+    parser.add_argument(
+        "--force", action="store_true",
+        help="Force rebuild of C library and wheel, and reinstall dev dependencies",
+    )
     parser.add_argument("--no-compile", action="store_true", help="Skip C library compilation")
     parser.add_argument("--no-wheel", action="store_true", help="Skip wheel building")
     parser.add_argument("--no-install", action="store_true", help="Skip dev dependency installation")
@@ -115,11 +211,11 @@ def main():
     
     # Install dev dependencies
     if not args.no_install:
-        install_dev_dependencies()
+        install_dev_dependencies(force=args.force)
     
     # Build wheel
     if not args.no_wheel:
-        build_wheel()
+        build_wheel(force=args.force)
     
     # Run tests if requested
     if args.test:
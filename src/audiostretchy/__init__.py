@@ -7,19 +7,23 @@ for versatile audio I/O to provide fast, high-quality time-stretching
 of audio files without changing their pitch.
 """
 
-import sys
+try:
+    # Written by the hatch-vcs build hook, avoids a metadata lookup on import
+    from ._version import __version__
+except ImportError:
+    import sys
 
-if sys.version_info[:2] >= (3, 8):
-    from importlib.metadata import PackageNotFoundError, version
-else:
-    from importlib_metadata import PackageNotFoundError, version
+    if sys.version_info[:2] >= (3, 8):
+        from importlib.metadata import PackageNotFoundError, version
+    else:
+        from importlib_metadata import PackageNotFoundError, version
 
-try:
-    __version__ = version("audiostretchy")
-except PackageNotFoundError:
-    __version__ = "unknown"
-finally:
-    del version, PackageNotFoundError
+    try:
+        __version__ = version("audiostretchy")
+    except PackageNotFoundError:
+        __version__ = "unknown"
+    finally:
+        del version, PackageNotFoundError
 
 from .core import AudioStretch, stretch_audio
 
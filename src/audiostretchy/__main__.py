@@ -5,15 +5,84 @@ Command-line interface for AudioStretchy.
 Provides CLI access to audio time-stretching functionality.
 """
 
-import fire
+import argparse
+import inspect
+import re
+import sys
+from typing import Dict, List, Optional
 
+from . import __version__
 from .core import stretch_audio
 
 
-def main():
+def _parse_bool(value: str) -> bool:
+    """Parse a boolean option value such as True/False, yes/no or 1/0."""
+    lowered = value.lower()
+    if lowered in ("true", "yes", "1"):
+        return True
+    if lowered in ("false", "no", "0"):
+        return False
+    raise argparse.ArgumentTypeError(f"Invalid boolean value: {value}")
+
+
+def _parse_arg_docs(doc: Optional[str]) -> Dict[str, str]:
+    """Extract parameter descriptions from the Args section of a docstring."""
+    args_section = (doc or "").split("Args:", 1)[-1]
+    return dict(re.findall(r"^\s+(\w+): (.+)$", args_section, re.MULTILINE))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser from the signature of stretch_audio."""
+    parser = argparse.ArgumentParser(
+        prog="audiostretchy",
+        description=inspect.getdoc(stretch_audio).split("\n\n", 1)[0],
+    )
+    parser.add_argument(
+        "--version", action="version", version=f"%(prog)s {__version__}"
+    )
+    docs = _parse_arg_docs(stretch_audio.__doc__)
+
+    for name, param in inspect.signature(stretch_audio).parameters.items():
+        help_text = docs.get(name)
+        option_names = dict.fromkeys([f"--{name}", f"--{name.replace('_', '-')}"])
+        if param.default is inspect.Parameter.empty:
+            parser.add_argument(name, help=help_text)
+        elif isinstance(param.default, bool):
+            # Accept both "--flag" and "--flag True/False"
+            parser.add_argument(
+                *option_names,
+                type=_parse_bool,
+                nargs="?",
+                const=True,
+                default=param.default,
+                help=help_text,
+            )
+        else:
+            parser.add_argument(
+                *option_names,
+                type=type(param.default),
+                default=param.default,
+                help=f"{help_text} (default: {param.default})",
+            )
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
     """Main CLI entry point."""
-    fire.core.Display = lambda lines, out: print(*lines, file=out)
-    fire.Fire(stretch_audio)
+    argv = sys.argv[1:] if argv is None else list(argv)
+
+    # The Fire-based interface stays available for its richer syntax
+    if "--fire" in argv:
+        argv.remove("--fire")
+        import fire
+
+        fire.core.Display = lambda lines, out: print(*lines, file=out)
+        fire.Fire(stretch_audio, command=argv, name="audiostretchy")
+        return
+
+    args = build_parser().parse_args(argv)
+    stretch_audio(**vars(args))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,50 @@
+/* this_file: src/audiostretchy/c_interface/_pack.c
+ *
+ * Conversion kernels between pedalboard's planar float32 samples and the
+ * interleaved int16 samples used by the audio-stretch library. Each kernel
+ * makes a single pass over the data; the loops are simple enough for the
+ * compiler to vectorize at -O3. Results match the numpy fallback in core.py:
+ * clip to [-1, 1], scale by 32767 and truncate, and scale by 1/32767 back.
+ */
+
+#include <stddef.h>
+#include <stdint.h>
+
+#define INV_32767 (1.0f / 32767.0f)
+
+static inline int16_t to_int16(float value)
+{
+    value = value < -1.0f ? -1.0f : value;
+    value = value > 1.0f ? 1.0f : value;
+    return (int16_t) (value * 32767.0f);
+}
+
+void pack_mono_f32_to_i16(const float *samples, int16_t *out, size_t n)
+{
+    for (size_t i = 0; i < n; i++)
+        out[i] = to_int16(samples[i]);
+}
+
+void pack_stereo_f32_to_i16_interleaved(const float *left, const float *right,
+                                        int16_t *out, size_t n)
+{
+    for (size_t i = 0; i < n; i++) {
+        out[2 * i] = to_int16(left[i]);
+        out[2 * i + 1] = to_int16(right[i]);
+    }
+}
+
+void unpack_i16_to_mono_f32(const int16_t *samples, float *out, size_t n)
+{
+    for (size_t i = 0; i < n; i++)
+        out[i] = samples[i] * INV_32767;
+}
+
+void unpack_i16_interleaved_to_stereo_f32(const int16_t *samples, float *left,
+                                          float *right, size_t n)
+{
+    for (size_t i = 0; i < n; i++) {
+        left[i] = samples[2 * i] * INV_32767;
+        right[i] = samples[2 * i + 1] * INV_32767;
+    }
+}
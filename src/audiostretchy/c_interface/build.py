@@ -4,24 +4,160 @@ Build utilities for compiling the audio-stretch C library.
 Handles cross-platform compilation and library placement.
 """
 
+import hashlib
+import json
 import os
 import platform
 import subprocess
 import shutil
+import sys
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+
+# Cross compilers for targets other than the host, keyed by (system, arch).
+# zig ships the headers and C runtimes for all of them.
+CROSS_COMPILERS = {
+    ("Linux", "x86_64"): ["zig", "cc", "-target", "x86_64-linux-gnu"],
+    ("Linux", "aarch64"): ["zig", "cc", "-target", "aarch64-linux-gnu"],
+    ("Darwin", "x86_64"): ["zig", "cc", "-target", "x86_64-macos"],
+    ("Darwin", "aarch64"): ["zig", "cc", "-target", "aarch64-macos"],
+    ("Windows", "x86_64"): ["zig", "cc", "-target", "x86_64-windows-gnu"],
+}
+
+# The public API of the library; every other symbol is kept local so the
+# dynamic symbol table stays small and the linker can drop unused code.
+_EXPORTED_SYMBOLS = [
+    "stretch_init",
+    "stretch_output_capacity",
+    "stretch_samples",
+    "stretch_flush",
+    "stretch_reset",
+    "stretch_deinit",
+]
+
+# Training workload for profile-guided builds. It runs in a separate process
+# so the instrumented library writes its profile data on exit.
+_PGO_TRAINING_SCRIPT = """
+import ctypes, sys, wave
+
+lib = ctypes.CDLL(sys.argv[1])
+lib.stretch_init.restype = ctypes.c_void_p
+lib.stretch_init.argtypes = [ctypes.c_int] * 4
+lib.stretch_output_capacity.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_float]
+lib.stretch_samples.argtypes = [
+    ctypes.c_void_p, ctypes.c_char_p, ctypes.c_int, ctypes.c_void_p, ctypes.c_float
+]
+lib.stretch_flush.argtypes = [ctypes.c_void_p, ctypes.c_void_p]
+lib.stretch_deinit.argtypes = [ctypes.c_void_p]
+
+with wave.open(sys.argv[2]) as w:
+    num_chans, rate = w.getnchannels(), w.getframerate()
+    data = w.readframes(w.getnframes())
+num_frames = len(data) // (2 * num_chans)
+
+for flags, ratios in ((0, (0.8, 1.25, 1.5)), (1, (0.8, 1.5)), (2, (0.5, 2.5))):
+    for ratio in ratios:
+        handle = lib.stretch_init(rate // 333, rate // 55, num_chans, flags)
+        capacity = lib.stretch_output_capacity(handle, num_frames, ratio)
+        output = ctypes.create_string_buffer(capacity * num_chans * 2)
+        lib.stretch_samples(handle, data, num_frames, output, ratio)
+        lib.stretch_flush(handle, output)
+        lib.stretch_deinit(handle)
+"""
+
+
+def _run_streamed(
+    cmd: List[str], cwd: Optional[Path] = None, env: Optional[Dict[str, str]] = None
+) -> int:
+    """
+    Run a command, echoing its combined stdout/stderr line by line as it runs.
+
+    Only the last 200 lines are kept in memory, for error reporting.
+
+    Returns:
+        The process return code (always 0)
+
+    Raises:
+        subprocess.CalledProcessError: If the command fails; ``output`` holds
+            the last lines of its output
+    """
+    tail: deque = deque(maxlen=200)
+    with subprocess.Popen(
+        cmd,
+        cwd=cwd,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        bufsize=1,
+    ) as process:
+        for line in process.stdout:
+            sys.stdout.write(line)
+            tail.append(line)
+    if process.returncode:
+        raise subprocess.CalledProcessError(
+            process.returncode, cmd, output="".join(tail)
+        )
+    return process.returncode
+
+
+def _normalize_arch(arch: str) -> str:
+    """Map platform.machine() spellings to the arch names of CROSS_COMPILERS."""
+    arch = arch.lower()
+    if arch in ("amd64", "x86_64"):
+        return "x86_64"
+    if arch in ("arm64", "aarch64"):
+        return "aarch64"
+    return arch
+
+
+def _build_one(
+    source_dir: Optional[Path],
+    output_dir: Path,
+    target: Tuple[str, str],
+    force: bool,
+) -> Path:
+    """Build the library for one (system, arch) target in a worker process."""
+    name = f"{target[0]}-{target[1]}".lower()
+    builder = AudioStretchBuilder(source_dir, output_dir, target=target)
+    if builder.cross_compiler:
+        if not shutil.which(builder.cross_compiler[0]):
+            raise RuntimeError(
+                f"{builder.cross_compiler[0]} not found, cannot cross-compile"
+            )
+        # The wrapper loads the host library from output_dir itself; the
+        # other targets, only packaged, get a directory and manifest each
+        builder.output_dir = output_dir / name
+    # Separate cache namespaces keep concurrent builds from contending
+    builder.ccache_dir = builder.project_root / ".cache" / f"ccache-{name}"
+    return builder.compile_library(force=force)
 
 
 class AudioStretchBuilder:
     """Handles compilation of the audio-stretch C library."""
 
-    def __init__(self, source_dir: Optional[Path] = None, output_dir: Optional[Path] = None):
+    MANIFEST_NAME = ".build_manifest.json"
+
+    def __init__(
+        self,
+        source_dir: Optional[Path] = None,
+        output_dir: Optional[Path] = None,
+        target: Optional[Tuple[str, str]] = None,
+    ):
         """
         Initialize the builder.
 
         Args:
             source_dir: Path to audio-stretch source code (defaults to project submodule)
             output_dir: Path for compiled libraries (defaults to c_interface/lib)
+            target: (system, arch) to build for (defaults to the host); targets
+                other than the host are cross-compiled with CROSS_COMPILERS
+
+        Raises:
+            RuntimeError: If no cross compiler is known for the target
         """
         self.project_root = Path(__file__).parent.parent.parent.parent
         self.source_dir = source_dir or self.project_root / "audio-stretch"
@@ -29,37 +165,154 @@ class AudioStretchBuilder:
         
         self.system = platform.system()
         self.arch = platform.machine().lower()
+        self.cross_compiler: Optional[List[str]] = None
+        self.ccache_dir = Path(
+            os.environ.get("CCACHE_DIR")
+            or Path.home() / ".cache" / "audiostretchy-ccache"
+        )
+        self._compiler_config: Optional[Dict[str, List[str]]] = None
+
+        if target and target != (self.system, _normalize_arch(self.arch)):
+            if target not in CROSS_COMPILERS:
+                raise RuntimeError(f"No cross compiler for {target[0]} ({target[1]})")
+            self.system, self.arch = target
+            self.cross_compiler = CROSS_COMPILERS[target]
+
+    def find_compiler_cache(self) -> Optional[str]:
+        """
+        Locate a compiler cache wrapper on PATH.
+
+        sccache is preferred when it has been configured through SCCACHE_DIR
+        or SCCACHE_BUCKET; otherwise ccache is used if available.
+
+        Returns:
+            Name of the wrapper executable, or None if none is installed
+        """
+        if os.environ.get("SCCACHE_DIR") or os.environ.get("SCCACHE_BUCKET"):
+            if shutil.which("sccache"):
+                return "sccache"
+        if shutil.which("ccache"):
+            return "ccache"
+        return None
+
+    def get_compiler_env(self) -> Dict[str, str]:
+        """Get the environment for compiler invocations."""
+        env = os.environ.copy()
+        env["CCACHE_DIR"] = str(self.ccache_dir)
+        if self.system == "Windows":
+            # ccache cannot fingerprint cl.exe by mtime, hash its contents instead
+            env.setdefault("CCACHE_COMPILERCHECK", "content")
+        return env
 
     def get_compiler_config(self) -> Dict[str, List[str]]:
-        """Get compiler configuration for the current platform."""
+        """Get compiler configuration for the current platform (computed once)."""
+        if self._compiler_config is not None:
+            return self._compiler_config
+
+        is_x64 = self.arch in ("amd64", "x86_64")
+        # -march/-mcpu=native tune for the build host, so they are only used
+        # when asked for and never for libraries that may run elsewhere
+        native = (
+            os.environ.get("AUDIOSTRETCHY_NATIVE") == "1" and not self.cross_compiler
+        )
+
+        # Vectorization flags for the TDHS correlation and overlap-add loops.
+        # On x86-64 they target AVX2 and FMA, exactly what the wrapper checks
+        # for before loading the separate "_avx2" library; NEON is baseline on
+        # 64-bit ARM, so there they apply to the regular library.
+        if is_x64:
+            posix_arch_flags = ["-ftree-vectorize", "-funroll-loops", "-mavx2", "-mfma"]
+            if native:
+                posix_arch_flags.append("-march=native")
+        else:
+            posix_arch_flags = ["-ftree-vectorize"]
+            if native:
+                posix_arch_flags.append("-mcpu=native")
+        simd_suffix = "_avx2" if is_x64 else ""
+
         configs = {
             "Windows": {
                 "compiler": ["cl.exe"],
-                "flags": ["/O2", "/LD", "/MT"],
+                "flags": ["/O2", "/MT", "/GL"],
+                "arch_flags": ["/arch:AVX2", "/Oi", "/Ot"] if is_x64 else [],
+                "compile_flag": "/c",
+                "object_flag": "/Fo:",
+                "object_extension": ".obj",
+                "link_flags": ["/LD"],
+                "linker_flags": ["/link", "/LTCG"],
                 "output_flag": "/Fe:",
                 "extension": ".dll",
-                "arch_suffix": "_x64" if self.arch in ("amd64", "x86_64") else "",
+                "arch_suffix": "_x64" if is_x64 else "",
+                "simd_suffix": simd_suffix,
             },
             "Darwin": {  # macOS
                 "compiler": ["clang"],
-                "flags": ["-O3", "-shared", "-fPIC"],
+                "flags": [
+                    "-O3", "-fPIC", "-flto", "-ffunction-sections", "-fdata-sections",
+                ],
+                "arch_flags": posix_arch_flags,
+                "compile_flag": "-c",
+                "object_flag": "-o",
+                "object_extension": ".o",
+                "link_flags": ["-shared", "-flto", "-Wl,-dead_strip"],
+                "linker_flags": [],
                 "output_flag": "-o",
                 "extension": ".dylib",
                 "arch_suffix": "_arm64" if self.arch in ("arm64", "aarch64") else "_x64",
+                "simd_suffix": simd_suffix,
             },
             "Linux": {
                 "compiler": ["gcc"],
-                "flags": ["-O3", "-shared", "-fPIC"],
+                "flags": [
+                    "-O3", "-fPIC", "-flto=auto", "-fno-plt",
+                    "-ffunction-sections", "-fdata-sections",
+                ],
+                "arch_flags": posix_arch_flags,
+                "compile_flag": "-c",
+                "object_flag": "-o",
+                "object_extension": ".o",
+                "link_flags": [
+                    "-shared",
+                    "-flto=auto",
+                    "-Wl,-O1,--as-needed,-z,now",
+                    "-Wl,--gc-sections",
+                ],
+                "linker_flags": [],
                 "output_flag": "-o",
                 "extension": ".so",
                 "arch_suffix": "_aarch64" if self.arch in ("aarch64", "arm64") else "_x64",
+                "simd_suffix": simd_suffix,
             },
         }
         
         if self.system not in configs:
             raise RuntimeError(f"Unsupported platform: {self.system}")
-            
-        return configs[self.system]
+
+        config = configs[self.system]
+
+        if self.cross_compiler:
+            if self.system == "Windows":
+                # zig targets MinGW, which takes GCC-style options
+                config.update({
+                    key: configs["Linux"][key]
+                    for key in ("compile_flag", "object_flag", "object_extension",
+                                "linker_flags", "output_flag")
+                })
+                config["flags"] = [
+                    "-O3", "-flto", "-ffunction-sections", "-fdata-sections",
+                ]
+                config["arch_flags"] = posix_arch_flags
+                config["link_flags"] = ["-shared", "-flto", "-Wl,--gc-sections"]
+            # zig cc caches compilations itself
+            config["compiler"] = list(self.cross_compiler)
+        else:
+            # Wrap the compiler with ccache/sccache so unchanged sources hit the cache
+            launcher = self.find_compiler_cache()
+            if launcher:
+                config["compiler"] = [launcher] + config["compiler"]
+
+        self._compiler_config = config
+        return config
 
     def find_source_files(self) -> List[Path]:
         """Find C source files to compile."""
@@ -73,101 +326,410 @@ class AudioStretchBuilder:
             
         return source_files
 
-    def compile_library(self, force: bool = False) -> Path:
+    def get_library_name(self, simd: bool = False) -> str:
+        """
+        Get the library filename for the current platform.
+
+        Args:
+            simd: Return the name of the SIMD-optimized variant
+
+        Returns:
+            Library filename, e.g. ``_stretch_x64.so`` or ``_stretch_x64_avx2.so``
+        """
+        config = self.get_compiler_config()
+        suffix = config["arch_suffix"] + (config["simd_suffix"] if simd else "")
+        return f"_stretch{suffix}{config['extension']}"
+
+    def compile_library(
+        self,
+        force: bool = False,
+        simd: bool = False,
+        parallel: bool = True,
+        pgo: Optional[bool] = None,
+    ) -> Path:
         """
         Compile the audio-stretch library.
 
+        Each source file is compiled to an object file, then the objects are
+        linked into the shared library.
+
         Args:
             force: Force recompilation even if library exists
+            simd: Build the SIMD-optimized variant (e.g. ``_stretch_x64_avx2.so``)
+                instead of the generic library. On platforms without a separate
+                variant the regular library is built.
+            parallel: Compile the source files concurrently, one compiler
+                process per CPU
+            pgo: Build with profile-guided optimization: compile an
+                instrumented library, train it on a sample file, then
+                recompile using the collected profile. Defaults to True when
+                the AUDIOSTRETCHY_PGO environment variable is "1". Not
+                supported with MSVC.
 
         Returns:
             Path to the compiled library
         """
         config = self.get_compiler_config()
-        
+        has_variant = bool(config["simd_suffix"])
+        simd = simd and has_variant
+
+        if pgo is None:
+            pgo = os.environ.get("AUDIOSTRETCHY_PGO") == "1"
+        if pgo and self.system == "Windows":
+            print("Profile-guided optimization is not supported with MSVC, skipping")
+            pgo = False
+        if pgo and self.cross_compiler:
+            print("Profile-guided optimization needs a native build, skipping")
+            pgo = False
+
         # Determine output filename
-        lib_name = f"_stretch{config['arch_suffix']}{config['extension']}"
+        lib_name = self.get_library_name(simd)
         output_path = self.output_dir / lib_name
         
-        # Check if compilation is needed
+        # Find source files
+        source_files = self.find_source_files()
+
+        # Build compiler flags
+        flags = list(config["flags"])
+        if simd or not has_variant:
+            flags.extend(config["arch_flags"])
+
+        # Check if compilation is needed: the library is up to date when it
+        # was built from sources with identical content and identical flags
+        manifest = self._load_manifest()
+        previous = manifest.get(lib_name, {})
+        entry = {
+            "flags": (
+                [config["compiler"][-1]]
+                + flags
+                + config["link_flags"]
+                + (["-fprofile-use"] if pgo else [])
+            ),
+            "sources": self._fingerprint_sources(
+                source_files, previous.get("sources", {})
+            ),
+        }
         if not force and output_path.exists():
-            source_files = self.find_source_files()
-            if all(output_path.stat().st_mtime > src.stat().st_mtime for src in source_files):
+            if previous:
+                up_to_date = previous["flags"] == entry["flags"] and (
+                    self._source_hashes(previous) == self._source_hashes(entry)
+                )
+            else:
+                # No manifest yet, fall back to comparing modification times
+                up_to_date = all(
+                    output_path.stat().st_mtime > src.stat().st_mtime
+                    for src in source_files
+                )
+            if up_to_date:
+                if previous != entry:
+                    manifest[lib_name] = entry
+                    self._write_manifest(manifest)
                 print(f"Library {lib_name} is up to date")
                 return output_path
 
         # Create output directory
         self.output_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Find source files
-        source_files = self.find_source_files()
-        
-        # Build command
-        cmd = config["compiler"].copy()
-        cmd.extend(config["flags"])
-        cmd.extend([str(f) for f in source_files])
-        
-        if config["output_flag"].endswith(":"):
-            cmd.append(f"{config['output_flag']}{output_path}")
-        else:
-            cmd.extend([config["output_flag"], str(output_path)])
-        
+
         print(f"Compiling {lib_name}...")
-        print(f"Command: {' '.join(cmd)}")
-        
-        try:
-            result = subprocess.run(
-                cmd,
-                cwd=self.source_dir,
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            
-            if result.stdout:
-                print("Compiler output:", result.stdout)
-                
-        except subprocess.CalledProcessError as e:
-            print(f"Compilation failed with return code {e.returncode}")
-            print(f"stdout: {e.stdout}")
-            print(f"stderr: {e.stderr}")
-            raise RuntimeError(f"Failed to compile {lib_name}") from e
+
+        with tempfile.TemporaryDirectory(prefix="audiostretchy-build-") as tmp:
+            obj_dir = Path(tmp)
+
+            if pgo:
+                # The instrumented objects must live at the same paths as the
+                # final ones, GCC looks up profile data by object file name
+                profile_dir = obj_dir / "pgo-data"
+                instrumented_path = obj_dir / f"instrumented{config['extension']}"
+                generate_flags = [f"-fprofile-generate={profile_dir}"]
+
+                print(f"Building instrumented {lib_name} for profiling...")
+                self._build(
+                    config, flags + generate_flags, source_files, obj_dir,
+                    instrumented_path, parallel, generate_flags,
+                )
+                self._train_profile(instrumented_path)
+                flags = flags + self._profile_use_flags(config, profile_dir)
+
+            self._build(config, flags, source_files, obj_dir, output_path, parallel)
+            self._strip(output_path)
         
         if not output_path.exists():
             raise RuntimeError(f"Compilation succeeded but {output_path} was not created")
+
+        manifest[lib_name] = entry
+        self._write_manifest(manifest)
             
         print(f"Successfully compiled {lib_name}")
         return output_path
 
+    @staticmethod
+    def _hash_file(path: Path) -> str:
+        """Compute the SHA-1 digest of a file, reading it in 1 MiB chunks."""
+        digest = hashlib.sha1()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _fingerprint_sources(
+        self, source_files: List[Path], previous: Dict[str, List]
+    ) -> Dict[str, List]:
+        """
+        Fingerprint source files as ``{path: [size, mtime_ns, sha1]}``.
+
+        Files whose size and mtime match the previous fingerprint reuse its
+        hash instead of being read again.
+        """
+        fingerprints = {}
+        for src in source_files:
+            stat = src.stat()
+            old = previous.get(str(src))
+            if old and old[0] == stat.st_size and old[1] == stat.st_mtime_ns:
+                sha1 = old[2]
+            else:
+                sha1 = self._hash_file(src)
+            fingerprints[str(src)] = [stat.st_size, stat.st_mtime_ns, sha1]
+        return fingerprints
+
+    @staticmethod
+    def _source_hashes(entry: Dict) -> Dict[str, str]:
+        """Map each source path in a manifest entry to its SHA-1 digest."""
+        return {src: fingerprint[2] for src, fingerprint in entry["sources"].items()}
+
+    def _load_manifest(self) -> Dict[str, Dict]:
+        """Load the build manifest, or return an empty one if missing or invalid."""
+        try:
+            with open(self.output_dir / self.MANIFEST_NAME) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return manifest if isinstance(manifest, dict) else {}
+
+    def _write_manifest(self, manifest: Dict[str, Dict]) -> None:
+        """Write the build manifest atomically."""
+        manifest_path = self.output_dir / self.MANIFEST_NAME
+        tmp_path = manifest_path.with_name(f"{manifest_path.name}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, manifest_path)
+
+    def _build(
+        self,
+        config: Dict[str, List[str]],
+        flags: List[str],
+        source_files: List[Path],
+        obj_dir: Path,
+        output_path: Path,
+        parallel: bool,
+        extra_link_flags: Optional[List[str]] = None,
+    ) -> None:
+        """Compile source files into obj_dir and link them into output_path."""
+
+        def compile_one(src: Path) -> Path:
+            return self._compile_object(config, flags, src, obj_dir)
+
+        if parallel and len(source_files) > 1:
+            max_workers = min(len(source_files), os.cpu_count() or 1)
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                objects = list(executor.map(compile_one, source_files))
+        else:
+            objects = [compile_one(src) for src in source_files]
+
+        self._link_shared(
+            config,
+            objects,
+            output_path,
+            extra_link_flags,
+            self._export_flags(config, obj_dir),
+        )
+
+    def _export_flags(self, config: Dict[str, List[str]], obj_dir: Path) -> List[str]:
+        """
+        Write the export list for the platform linker and get the flags using it.
+
+        stretch.h carries no visibility annotations, so instead of
+        -fvisibility=hidden the exports are restricted at link time.
+        """
+        if self.system == "Windows":
+            def_path = obj_dir / "_stretch.def"
+            exports = "".join(f"    {s}\n" for s in _EXPORTED_SYMBOLS)
+            def_path.write_text("EXPORTS\n" + exports)
+            if config["compiler"][-1] == "cl.exe":
+                return [f"/DEF:{def_path}"]
+            # MinGW drivers take .def files as plain inputs
+            return [str(def_path)]
+
+        if self.system == "Darwin":
+            list_path = obj_dir / "exports.txt"
+            list_path.write_text("".join(f"_{s}\n" for s in _EXPORTED_SYMBOLS))
+            return [f"-Wl,-exported_symbols_list,{list_path}"]
+
+        script_path = obj_dir / "exports.map"
+        script_path.write_text(
+            "{\n  global:\n"
+            + "".join(f"    {s};\n" for s in _EXPORTED_SYMBOLS)
+            + "  local: *;\n};\n"
+        )
+        return [f"-Wl,--version-script={script_path}"]
+
+    def _strip(self, lib_path: Path) -> None:
+        """Strip local symbols from a POSIX shared library if strip is available."""
+        strip = shutil.which("strip")
+        if self.system == "Windows" or self.cross_compiler or not strip:
+            return
+
+        try:
+            _run_streamed([strip, "-x", str(lib_path)])
+        except subprocess.CalledProcessError:
+            print(f"Warning: failed to strip {lib_path.name}, keeping symbols")
+
+    def _train_profile(self, lib_path: Path) -> None:
+        """Run an instrumented library on a sample file to collect a profile."""
+        sample_path = self.project_root / "tests" / "audio.wav"
+        if not sample_path.exists():
+            raise FileNotFoundError(f"PGO training file not found: {sample_path}")
+
+        print(f"Training profile on {sample_path.name}...")
+        try:
+            cmd = [
+                sys.executable,
+                "-c",
+                _PGO_TRAINING_SCRIPT,
+                str(lib_path),
+                str(sample_path),
+            ]
+            _run_streamed(cmd)
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError("PGO training run failed") from e
+
+    def _profile_use_flags(
+        self, config: Dict[str, List[str]], profile_dir: Path
+    ) -> List[str]:
+        """Get the flags that apply a collected profile to the final build."""
+        if config["compiler"][-1] != "clang":
+            return [f"-fprofile-use={profile_dir}", "-fprofile-correction"]
+
+        # Clang writes raw profiles that need to be merged before use
+        profdata = profile_dir / "default.profdata"
+        merge = ["llvm-profdata"]
+        if self.system == "Darwin":
+            merge = ["xcrun"] + merge
+        merge += ["merge", f"-output={profdata}"]
+        merge += [str(p) for p in profile_dir.glob("*.profraw")]
+        self._run_compiler(merge, profdata.name)
+        return [f"-fprofile-use={profdata}"]
+
+    def _compile_object(
+        self, config: Dict[str, List[str]], flags: List[str], src: Path, obj_dir: Path
+    ) -> Path:
+        """Compile a single source file to an object file in obj_dir."""
+        obj_path = obj_dir / f"{src.stem}{config['object_extension']}"
+
+        cmd = config["compiler"].copy()
+        cmd.extend(flags)
+        cmd.extend([config["compile_flag"], str(src)])
+        cmd.extend(self._output_args(config["object_flag"], obj_path))
+
+        self._run_compiler(cmd, src.name)
+        return obj_path
+
+    def _link_shared(
+        self,
+        config: Dict[str, List[str]],
+        objects: List[Path],
+        output_path: Path,
+        extra_flags: Optional[List[str]] = None,
+        export_flags: Optional[List[str]] = None,
+    ) -> None:
+        """Link object files into a shared library."""
+        cmd = config["compiler"].copy()
+        cmd.extend(config["link_flags"])
+        cmd.extend(extra_flags or [])
+        cmd.extend([str(obj) for obj in objects])
+        cmd.extend(self._output_args(config["output_flag"], output_path))
+        cmd.extend(config["linker_flags"])
+        # Passed last so that on MSVC they land after /link
+        cmd.extend(export_flags or [])
+
+        self._run_compiler(cmd, output_path.name)
+
+    @staticmethod
+    def _output_args(output_flag: str, path: Path) -> List[str]:
+        """Format an output option, e.g. ``-o out.so`` or ``/Fe:out.dll``."""
+        if output_flag.endswith(":"):
+            return [f"{output_flag}{path}"]
+        return [output_flag, str(path)]
+
+    def _run_compiler(self, cmd: List[str], target: str) -> None:
+        """Run a compiler or linker command, raising RuntimeError on failure."""
+        print(f"Command: {' '.join(cmd)}")
+        
+        try:
+            _run_streamed(cmd, cwd=self.source_dir, env=self.get_compiler_env())
+        except subprocess.CalledProcessError as e:
+            print(f"Compilation failed with return code {e.returncode}")
+            if e.output:
+                print(f"Last output lines:\n{e.output}")
+            raise RuntimeError(f"Failed to compile {target}") from e
+
     def clean(self) -> None:
         """Remove compiled libraries."""
         if self.output_dir.exists():
             shutil.rmtree(self.output_dir)
             print(f"Cleaned {self.output_dir}")
 
-    def build_all_platforms(self, platforms: Optional[List[str]] = None) -> Dict[str, Path]:
+    def build_all_platforms(
+        self, platforms: Optional[List[str]] = None, force: bool = False
+    ) -> Dict[str, Path]:
         """
         Build libraries for multiple platforms (for CI use).
-        
+
+        Each target is built in its own process, which compiles its sources
+        in parallel. The host library goes into output_dir as with
+        compile_library, where the wrapper loads it; cross-compiled targets
+        go into ``output_dir/<system>-<arch>/``, so the targets do not share
+        a build manifest.
+
         Args:
-            platforms: List of platforms to build for (None = current platform only)
-            
+            platforms: Targets to build, as system names ("Linux") for all
+                architectures of CROSS_COMPILERS or "system-arch" strings
+                ("Darwin-aarch64") for one (None = current platform only)
+            force: Force recompilation even if the libraries are up to date
+
         Returns:
-            Dict mapping platform names to compiled library paths
+            Dict mapping "system-arch" target names (e.g. "Linux-x86_64") to
+            compiled library paths; a target system may have several
+            architectures, so system names alone are not used as keys
         """
-        if platforms is None:
-            platforms = [self.system]
-            
-        results = {}
-        
-        for platform_name in platforms:
-            if platform_name == self.system:
-                # Build for current platform
-                lib_path = self.compile_library()
-                results[platform_name] = lib_path
+        host = (self.system, _normalize_arch(self.arch))
+        targets: List[Tuple[str, str]] = []
+        for platform_name in platforms or [host[0]]:
+            system, _, arch = platform_name.partition("-")
+            if arch:
+                targets.append((system, _normalize_arch(arch)))
+            elif platforms is None:
+                targets.append(host)
             else:
-                print(f"Cross-compilation for {platform_name} not implemented")
-                
+                targets.extend(t for t in CROSS_COMPILERS if t[0] == system)
+
+        results = {}
+        if not targets:
+            return results
+
+        max_workers = min(len(targets), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                f"{system}-{arch}": executor.submit(
+                    _build_one, self.source_dir, self.output_dir, (system, arch), force
+                )
+                for system, arch in dict.fromkeys(targets)
+            }
+            for name, future in futures.items():
+                try:
+                    results[name] = future.result()
+                except (RuntimeError, FileNotFoundError) as e:
+                    print(f"Build for {name} failed: {e}")
+
         return results
 
 
@@ -177,18 +739,49 @@ def main():
     
     parser = argparse.ArgumentParser(description="Build audio-stretch C library")
     parser.add_argument("--force", action="store_true", help="Force recompilation")
+    parser.add_argument(
+        "--simd", action="store_true", help="Build the SIMD-optimized variant"
+    )
+    parser.add_argument(
+        "--pgo",
+        action="store_true",
+        default=None,
+        help="Use profile-guided optimization",
+    )
+    parser.add_argument(
+        "--serial", action="store_true", help="Compile sources one at a time"
+    )
+    parser.add_argument(
+        "--platform",
+        action="append",
+        dest="platforms",
+        help="Build for a platform (e.g. Linux or Darwin-aarch64); may be repeated",
+    )
     parser.add_argument("--clean", action="store_true", help="Clean compiled libraries")
     parser.add_argument("--source-dir", type=Path, help="Audio-stretch source directory")
     parser.add_argument("--output-dir", type=Path, help="Output directory for libraries")
+    parser.add_argument("--verbose", action="store_true", help="Verbose output")
     
     args = parser.parse_args()
     
     builder = AudioStretchBuilder(args.source_dir, args.output_dir)
+
+    if args.verbose:
+        print(f"Source directory: {builder.source_dir}")
+        print(f"Output directory: {builder.output_dir}")
+        print(f"Platform: {builder.system} ({builder.arch})")
     
     if args.clean:
         builder.clean()
+    elif args.platforms:
+        results = builder.build_all_platforms(args.platforms, force=args.force)
+        for name, lib_path in results.items():
+            print(f"Compiled library for {name}: {lib_path}")
     else:
-        builder.compile_library(force=args.force)
+        lib_path = builder.compile_library(
+            force=args.force, simd=args.simd, parallel=not args.serial, pgo=args.pgo
+        )
+        print(f"Compiled library: {lib_path}")
 
 
 if __name__ == "__main__":
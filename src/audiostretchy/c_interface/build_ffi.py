@@ -0,0 +1,178 @@
+# this_file: src/audiostretchy/c_interface/build_ffi.py
+"""
+Build script for the cffi extension module of the audio-stretch C library.
+Compiles stretch.c into _audiostretch_cffi, which wrapper.py prefers over ctypes,
+together with the sample conversion kernels of _pack.c used by core.py.
+"""
+
+import platform
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+MODULE_NAME = "_audiostretch_cffi"
+PACK_SOURCE = Path(__file__).parent / "_pack.c"
+
+# stretch_samples/stretch_flush are exposed through *_addr shims that take
+# buffer addresses as integers, the same values the ctypes path passes, so
+# the wrapper code is identical for both backends
+CDEF = """
+void *stretch_init(int shortest_period, int longest_period, int num_chans, int flags);
+int stretch_output_capacity(void *handle, int max_num_samples, float max_ratio);
+int stretch_samples_addr(void *handle, intptr_t samples, int num_samples,
+                         intptr_t output, float ratio);
+int stretch_flush_addr(void *handle, intptr_t output);
+void stretch_reset(void *handle);
+void stretch_deinit(void *handle);
+
+void pack_mono_f32_to_i16(const float *samples, int16_t *out, size_t n);
+void pack_stereo_f32_to_i16_interleaved(const float *left, const float *right,
+                                        int16_t *out, size_t n);
+void unpack_i16_to_mono_f32(const int16_t *samples, float *out, size_t n);
+void unpack_i16_interleaved_to_stereo_f32(const int16_t *samples, float *left,
+                                          float *right, size_t n);
+"""
+
+SOURCE = """
+#include <stddef.h>
+#include <stdint.h>
+#include "stretch.h"
+
+void pack_mono_f32_to_i16(const float *samples, int16_t *out, size_t n);
+void pack_stereo_f32_to_i16_interleaved(const float *left, const float *right,
+                                        int16_t *out, size_t n);
+void unpack_i16_to_mono_f32(const int16_t *samples, float *out, size_t n);
+void unpack_i16_interleaved_to_stereo_f32(const int16_t *samples, float *left,
+                                          float *right, size_t n);
+
+static int stretch_samples_addr(void *handle, intptr_t samples, int num_samples,
+                                intptr_t output, float ratio)
+{
+    return stretch_samples(handle, (const short *) samples, num_samples,
+                           (short *) output, ratio);
+}
+
+static int stretch_flush_addr(void *handle, intptr_t output)
+{
+    return stretch_flush(handle, (short *) output);
+}
+"""
+
+
+def make_ffibuilder(source_dir: Path):
+    """
+    Create the cffi builder for the sources in source_dir.
+
+    Args:
+        source_dir: Path to audio-stretch source code
+
+    Returns:
+        Configured cffi.FFI instance
+    """
+    from cffi import FFI
+
+    from .build import AudioStretchBuilder
+
+    # Same optimization, LTO and section flags as the ctypes library. The
+    # module holds the generic build only: on x86-64 the vectorized variant
+    # stays a separate ctypes library, which wrapper.py prefers when the CPU
+    # supports it.
+    config = AudioStretchBuilder(source_dir).get_compiler_config()
+    extra_compile_args = list(config["flags"])
+    if not config["simd_suffix"]:
+        extra_compile_args.extend(config["arch_flags"])
+    if platform.system() == "Windows":
+        # Extension modules use the same dynamic CRT as Python
+        extra_compile_args.remove("/MT")
+        extra_link_args = ["/LTCG"]
+    else:
+        # Only PyInit needs to be exported
+        extra_compile_args.append("-fvisibility=hidden")
+        extra_link_args = [flag for flag in config["link_flags"] if flag != "-shared"]
+
+    ffibuilder = FFI()
+    ffibuilder.cdef(CDEF)
+    ffibuilder.set_source(
+        MODULE_NAME,
+        SOURCE,
+        sources=[str(source_dir / "stretch.c"), str(PACK_SOURCE)],
+        include_dirs=[str(source_dir)],
+        extra_compile_args=extra_compile_args,
+        extra_link_args=extra_link_args,
+    )
+    return ffibuilder
+
+
+def build_ffi(
+    source_dir: Optional[Path] = None,
+    output_dir: Optional[Path] = None,
+    force: bool = False,
+) -> Path:
+    """
+    Compile the cffi extension module.
+
+    Args:
+        source_dir: Path to audio-stretch source code (defaults to project submodule)
+        output_dir: Directory for the module (defaults to the c_interface package)
+        force: Force recompilation even if the module is up to date
+
+    Returns:
+        Path to the compiled extension module
+
+    Raises:
+        FileNotFoundError: If stretch.c is missing
+        ImportError: If cffi is not installed
+    """
+    package_dir = Path(__file__).parent
+    source_dir = source_dir or package_dir.parent.parent.parent / "audio-stretch"
+    output_dir = output_dir or package_dir
+
+    stretch_c = source_dir / "stretch.c"
+    if not stretch_c.exists():
+        raise FileNotFoundError(f"stretch.c not found in {source_dir}")
+
+    existing = sorted(output_dir.glob(f"{MODULE_NAME}.*"))
+    if existing and not force:
+        sources = [stretch_c, source_dir / "stretch.h", PACK_SOURCE, Path(__file__)]
+        newest = max(p.stat().st_mtime for p in sources if p.exists())
+        if existing[0].stat().st_mtime > newest:
+            print(f"{existing[0].name} is up to date")
+            return existing[0]
+
+    ffibuilder = make_ffibuilder(source_dir)
+
+    print(f"Compiling {MODULE_NAME}...")
+    output_dir.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(prefix="audiostretchy-cffi-") as tmp_dir:
+        built = Path(ffibuilder.compile(tmpdir=tmp_dir))
+        for old in existing:
+            old.unlink()
+        module_path = output_dir / built.name
+        shutil.copy2(built, module_path)
+
+    print(f"Successfully compiled {module_path.name}")
+    return module_path
+
+
+def main():
+    """Command-line interface for building the cffi module."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the audio-stretch cffi module")
+    parser.add_argument("--force", action="store_true", help="Force recompilation")
+    parser.add_argument(
+        "--source-dir", type=Path, help="Audio-stretch source directory"
+    )
+    parser.add_argument(
+        "--output-dir", type=Path, help="Output directory for the module"
+    )
+
+    args = parser.parse_args()
+
+    module_path = build_ffi(args.source_dir, args.output_dir, force=args.force)
+    print(f"Compiled module: {module_path}")
+
+
+if __name__ == "__main__":
+    main()
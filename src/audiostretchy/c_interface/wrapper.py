@@ -1,16 +1,192 @@
 # this_file: src/audiostretchy/c_interface/wrapper.py
 """
-Python ctypes wrapper for the audio-stretch C library.
+Python wrapper for the audio-stretch C library.
 Provides high-level interface to the TDHS (Time-Domain Harmonic Scaling) algorithm.
+Uses the cffi extension module when it has been built, ctypes otherwise.
 """
 
 import ctypes
 import platform
+import subprocess
+import threading
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
 
 import numpy as np
 
+try:
+    from . import _audiostretch_cffi
+except ImportError:
+    _audiostretch_cffi = None
+
+_LIB_DIR = Path(__file__).parent / "lib"
+
+_ARCH_FAMILIES = {"amd64": "x64", "x86_64": "x64", "arm64": "arm", "aarch64": "arm"}
+
+_GENERIC_LIB_NAMES = {
+    "Windows": "_stretch.dll",
+    "Darwin": "_stretch.dylib",
+    "Linux": "_stretch.so",
+}
+
+# Library file names to try for each (system, arch family), in order
+_LIB_CANDIDATES = {
+    ("Windows", "x64"): ["_stretch_x64.dll", "_stretch.dll"],
+    ("Darwin", "x64"): ["_stretch_x64.dylib", "_stretch.dylib"],
+    ("Darwin", "arm"): ["_stretch_arm64.dylib", "_stretch.dylib"],
+    ("Linux", "x64"): ["_stretch_x64.so", "_stretch.so"],
+    ("Linux", "arm"): ["_stretch_aarch64.so", "_stretch.so"],
+}
+
+# Shared library, loaded once per process by _get_lib()
+_LIB: Optional[Any] = None
+_LIB_LOCK = threading.Lock()
+
+
+def _cpu_supports_avx2() -> bool:
+    """Check whether the CPU (and OS) support AVX2 and FMA instructions."""
+    system = platform.system()
+    try:
+        if system == "Linux":
+            with open("/proc/cpuinfo") as f:
+                for line in f:
+                    if line.startswith("flags"):
+                        flags = line.split()
+                        return "avx2" in flags and "fma" in flags
+        elif system == "Darwin":
+            features = subprocess.run(
+                ["sysctl", "-n", "machdep.cpu.leaf7_features", "machdep.cpu.features"],
+                capture_output=True,
+                text=True,
+            ).stdout.upper().split()
+            return "AVX2" in features and "FMA" in features
+        elif system == "Windows":
+            PF_AVX2_INSTRUCTIONS_AVAILABLE = 40
+            return bool(
+                ctypes.windll.kernel32.IsProcessorFeaturePresent(
+                    PF_AVX2_INSTRUCTIONS_AVAILABLE
+                )
+            )
+    except (OSError, AttributeError):
+        pass
+    return False
+
+
+def _simd_lib_path() -> Optional[Path]:
+    """Find the AVX2 build of the library, if it exists and the CPU can run it."""
+    system = platform.system()
+    family = _ARCH_FAMILIES.get(platform.machine().lower(), "other")
+    if family != "x64" or (system, family) not in _LIB_CANDIDATES:
+        return None
+    if not _cpu_supports_avx2():
+        return None
+
+    stem, ext = _LIB_CANDIDATES[(system, family)][0].rsplit(".", 1)
+    lib_path = _LIB_DIR / f"{stem}_avx2.{ext}"
+    return lib_path if lib_path.exists() else None
+
+
+def _resolve_lib_path() -> Path:
+    """Find the shared library for the current platform."""
+    system = platform.system()
+    family = _ARCH_FAMILIES.get(platform.machine().lower(), "other")
+
+    if system not in _GENERIC_LIB_NAMES:
+        raise RuntimeError(f"Unsupported platform: {system}")
+
+    # Prefer the AVX2 build when the CPU can run it
+    simd_path = _simd_lib_path()
+    if simd_path is not None:
+        return simd_path
+
+    candidates = _LIB_CANDIDATES.get((system, family), [_GENERIC_LIB_NAMES[system]])
+    for lib_name in candidates:
+        lib_path = _LIB_DIR / lib_name
+        if lib_path.exists():
+            return lib_path
+
+    raise RuntimeError(
+        f"Audio stretch library not found at {_LIB_DIR / candidates[-1]}"
+    )
+
+
+def _bind_signatures(lib: ctypes.CDLL) -> None:
+    """Set up ctypes function signatures for the C library."""
+    # stretch_init
+    lib.stretch_init.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int]
+    lib.stretch_init.restype = ctypes.c_void_p
+
+    # stretch_output_capacity
+    lib.stretch_output_capacity.argtypes = [
+        ctypes.c_void_p,
+        ctypes.c_int,
+        ctypes.c_float,
+    ]
+    lib.stretch_output_capacity.restype = ctypes.c_int
+
+    # stretch_samples/stretch_flush take buffer addresses as plain pointers;
+    # the arrays are validated once in Python instead of by ndpointer per call
+    lib.stretch_samples.argtypes = [
+        ctypes.c_void_p,
+        ctypes.c_void_p,
+        ctypes.c_int,
+        ctypes.c_void_p,
+        ctypes.c_float,
+    ]
+    lib.stretch_samples.restype = ctypes.c_int
+
+    # stretch_flush
+    lib.stretch_flush.argtypes = [ctypes.c_void_p, ctypes.c_void_p]
+    lib.stretch_flush.restype = ctypes.c_int
+
+    # stretch_reset
+    lib.stretch_reset.argtypes = [ctypes.c_void_p]
+    lib.stretch_reset.restype = None
+
+    # stretch_deinit
+    lib.stretch_deinit.argtypes = [ctypes.c_void_p]
+    lib.stretch_deinit.restype = None
+
+
+def _check_buffer(array: np.ndarray, name: str, writable: bool = False) -> None:
+    """Check that an array can be passed to the C library as an int16 pointer."""
+    if array.dtype != np.int16 or not array.flags["C_CONTIGUOUS"]:
+        raise ValueError(f"{name} must be a C-contiguous int16 array")
+    if writable and not array.flags["WRITEABLE"]:
+        raise ValueError(f"{name} must be writable")
+
+
+def _get_lib() -> Any:
+    """
+    Get the process-wide shared library instance.
+
+    This is the ``lib`` of the cffi extension module if it is available,
+    unless an AVX2 library the CPU can run has been built: the cffi module
+    only holds the generic build. Otherwise the ctypes library is located,
+    loaded and bound on first use only, so creating many stretchers does not
+    repeat the platform probing or dlopen.
+    """
+    global _LIB
+    if _LIB is None:
+        with _LIB_LOCK:
+            if (
+                _LIB is None
+                and _audiostretch_cffi is not None
+                and _simd_lib_path() is None
+            ):
+                _LIB = _audiostretch_cffi.lib
+            elif _LIB is None:
+                lib_path = _resolve_lib_path()
+                try:
+                    lib = ctypes.cdll.LoadLibrary(str(lib_path))
+                except OSError as e:
+                    raise RuntimeError(
+                        f"Failed to load audio stretch library: {e}"
+                    ) from e
+                _bind_signatures(lib)
+                _LIB = lib
+    return _LIB
+
 
 class TDHSAudioStretch:
     """
@@ -39,95 +215,33 @@ class TDHSAudioStretch:
         """
         self._lib = self._load_library()
         self._setup_function_signatures()
+
+        self.num_chans = num_chans
+        self.longest_period = longest_period
+        self._out_buf = np.empty(0, dtype=np.int16)
         
         self.handle = self.stretch_init(shortest_period, longest_period, num_chans, flags)
         if not self.handle:
             raise RuntimeError("Failed to initialize audio stretch context")
 
-    def _load_library(self) -> ctypes.CDLL:
-        """Load the appropriate shared library for the current platform."""
-        system = platform.system()
-        arch = platform.machine().lower()
-        
-        # Determine library filename based on platform and architecture
-        if system == "Windows":
-            if arch in ("amd64", "x86_64"):
-                lib_name = "_stretch_x64.dll"
-            else:
-                lib_name = "_stretch.dll"
-        elif system == "Darwin":  # macOS
-            if arch in ("arm64", "aarch64"):
-                lib_name = "_stretch_arm64.dylib"
-            else:
-                lib_name = "_stretch_x64.dylib"
-        elif system == "Linux":
-            if arch in ("aarch64", "arm64"):
-                lib_name = "_stretch_aarch64.so"
-            else:
-                lib_name = "_stretch_x64.so"
-        else:
-            raise RuntimeError(f"Unsupported platform: {system}")
-
-        # Look for the library in the package directory
-        lib_path = Path(__file__).parent / "lib" / lib_name
-        
-        if not lib_path.exists():
-            # Fallback to generic name
-            generic_names = {
-                "Windows": "_stretch.dll",
-                "Darwin": "_stretch.dylib", 
-                "Linux": "_stretch.so"
-            }
-            lib_path = Path(__file__).parent / "lib" / generic_names[system]
-            
-        if not lib_path.exists():
-            raise RuntimeError(f"Audio stretch library not found at {lib_path}")
-
-        try:
-            return ctypes.cdll.LoadLibrary(str(lib_path))
-        except OSError as e:
-            raise RuntimeError(f"Failed to load audio stretch library: {e}") from e
+    def _load_library(self) -> Any:
+        """Get the shared library, loading it on first use in this process."""
+        return _get_lib()
 
     def _setup_function_signatures(self) -> None:
-        """Set up ctypes function signatures for the C library."""
-        # stretch_init
-        self.stretch_init = self._lib.stretch_init
-        self.stretch_init.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int]
-        self.stretch_init.restype = ctypes.c_void_p
-
-        # stretch_output_capacity
-        self.stretch_output_capacity = self._lib.stretch_output_capacity
-        self.stretch_output_capacity.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_float]
-        self.stretch_output_capacity.restype = ctypes.c_int
-
-        # stretch_samples
-        self.stretch_samples = self._lib.stretch_samples
-        self.stretch_samples.argtypes = [
-            ctypes.c_void_p,
-            np.ctypeslib.ndpointer(dtype=np.int16),
-            ctypes.c_int,
-            np.ctypeslib.ndpointer(dtype=np.int16),
-            ctypes.c_float,
-        ]
-        self.stretch_samples.restype = ctypes.c_int
-
-        # stretch_flush
-        self.stretch_flush = self._lib.stretch_flush
-        self.stretch_flush.argtypes = [
-            ctypes.c_void_p,
-            np.ctypeslib.ndpointer(dtype=np.int16),
-        ]
-        self.stretch_flush.restype = ctypes.c_int
-
-        # stretch_reset
-        self.stretch_reset = self._lib.stretch_reset
-        self.stretch_reset.argtypes = [ctypes.c_void_p]
-        self.stretch_reset.restype = None
-
-        # stretch_deinit
-        self.stretch_deinit = self._lib.stretch_deinit
-        self.stretch_deinit.argtypes = [ctypes.c_void_p]
-        self.stretch_deinit.restype = None
+        """Bind the library functions; ctypes signatures are set once per process."""
+        lib = self._lib
+        self.stretch_init = lib.stretch_init
+        self.stretch_output_capacity = lib.stretch_output_capacity
+        if _audiostretch_cffi is not None and lib is _audiostretch_cffi.lib:
+            # cffi shims taking buffer addresses like the ctypes signatures
+            self.stretch_samples = lib.stretch_samples_addr
+            self.stretch_flush = lib.stretch_flush_addr
+        else:
+            self.stretch_samples = lib.stretch_samples
+            self.stretch_flush = lib.stretch_flush
+        self.stretch_reset = lib.stretch_reset
+        self.stretch_deinit = lib.stretch_deinit
 
     def output_capacity(self, max_num_samples: int, max_ratio: float) -> int:
         """
@@ -142,6 +256,24 @@ class TDHSAudioStretch:
         """
         return self.stretch_output_capacity(self.handle, max_num_samples, max_ratio)
 
+    def flush_capacity(self, max_ratio: float) -> int:
+        """
+        Calculate the output buffer capacity needed by flush.
+
+        Each stage of the library buffers longest_period * max_periods
+        samples per channel, with max_periods of 3 or 4, and dual mode
+        cascades a second stage. 8 * longest_period is a conservative bound
+        covering both stages, independent of how much audio has been
+        processed; do not tighten it, or flush can overrun the buffer.
+
+        Args:
+            max_ratio: Maximum stretch ratio expected
+
+        Returns:
+            Required flush buffer size in samples
+        """
+        return self.output_capacity(8 * self.longest_period, max_ratio)
+
     def process_samples(
         self, 
         samples: np.ndarray, 
@@ -160,8 +292,110 @@ class TDHSAudioStretch:
 
         Returns:
             Number of output samples produced
+
+        Raises:
+            ValueError: If a buffer is not a C-contiguous int16 array
+        """
+        _check_buffer(samples, "samples")
+        _check_buffer(output, "output", writable=True)
+        return self.stretch_samples(
+            self.handle, samples.ctypes.data, num_samples, output.ctypes.data, ratio
+        )
+
+    def process_samples_inplace(self, samples: np.ndarray, ratio: float) -> np.ndarray:
+        """
+        Process audio samples into an output buffer owned by the stretcher.
+
+        The buffer is reused across calls and only reallocated when a call
+        needs more capacity than any previous one.
+
+        Args:
+            samples: Input audio samples (int16, interleaved)
+            ratio: Stretch ratio (>1.0 = slower, <1.0 = faster)
+
+        Returns:
+            View of the produced samples (int16, interleaved). It is only
+            valid until the next call; copy it to keep the data.
+
+        Raises:
+            ValueError: If samples is not a C-contiguous int16 array
         """
-        return self.stretch_samples(self.handle, samples, num_samples, output, ratio)
+        _check_buffer(samples, "samples")
+        num_samples = len(samples) // self.num_chans
+
+        capacity = self.output_capacity(num_samples, ratio) * self.num_chans
+        if self._out_buf.size < capacity:
+            self._out_buf = np.empty(capacity, dtype=np.int16)
+
+        produced = self.stretch_samples(
+            self.handle,
+            samples.ctypes.data,
+            num_samples,
+            self._out_buf.ctypes.data,
+            ratio,
+        )
+        return self._out_buf[: produced * self.num_chans]
+
+    def process_stream(
+        self,
+        samples: np.ndarray,
+        ratio: float,
+        chunk_size: int = 1024
+    ) -> np.ndarray:
+        """
+        Stretch a whole buffer by feeding it to the library in small chunks.
+
+        The chunks are processed in a single loop with one reusable output
+        buffer, so per-chunk overhead stays close to the C call itself.
+        The stream is flushed at the end, until the library has returned all
+        buffered samples.
+
+        Args:
+            samples: Input audio samples (int16, interleaved)
+            ratio: Stretch ratio (>1.0 = slower, <1.0 = faster)
+            chunk_size: Number of samples per channel passed per call
+
+        Returns:
+            Stretched audio samples (int16, interleaved)
+
+        Raises:
+            ValueError: If samples is not a C-contiguous int16 array
+        """
+        _check_buffer(samples, "samples")
+        num_chans = self.num_chans
+        num_frames = len(samples) // num_chans
+
+        # Large enough for one chunk as well as for flushing the internal buffer
+        capacity = max(
+            self.output_capacity(chunk_size, ratio), self.flush_capacity(ratio)
+        )
+        scratch = np.empty(capacity * num_chans, dtype=np.int16)
+
+        stretch_samples = self.stretch_samples
+        handle = self.handle
+        in_ptr = samples.ctypes.data
+        out_ptr = scratch.ctypes.data
+        frame_bytes = num_chans * samples.itemsize
+
+        chunks = []
+        for start in range(0, num_frames, chunk_size):
+            count = min(chunk_size, num_frames - start)
+            produced = stretch_samples(
+                handle, in_ptr + start * frame_bytes, count, out_ptr, ratio
+            )
+            if produced:
+                chunks.append(scratch[: produced * num_chans].copy())
+
+        # In dual mode the library hands out its buffered audio over several
+        # flush calls, so flush until it returns nothing
+        flushed = self.stretch_flush(handle, out_ptr)
+        while flushed:
+            chunks.append(scratch[: flushed * num_chans].copy())
+            flushed = self.stretch_flush(handle, out_ptr)
+
+        if not chunks:
+            return np.empty(0, dtype=np.int16)
+        return np.concatenate(chunks)
 
     def flush(self, output: np.ndarray) -> int:
         """
@@ -172,8 +406,12 @@ class TDHSAudioStretch:
 
         Returns:
             Number of flushed samples
+
+        Raises:
+            ValueError: If the buffer is not a writable C-contiguous int16 array
         """
-        return self.stretch_flush(self.handle, output)
+        _check_buffer(output, "output", writable=True)
+        return self.stretch_flush(self.handle, output.ctypes.data)
 
     def reset(self) -> None:
         """Reset the stretch context to initial state."""
@@ -4,9 +4,22 @@ Core AudioStretch class with Pedalboard I/O integration.
 Provides high-level interface for audio time-stretching operations.
 """
 
+import os
+import queue
+import threading
+import uuid
 from io import BytesIO
 from pathlib import Path
-from typing import BinaryIO, Optional, Union
+from typing import (
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    Optional,
+    Tuple,
+    Union,
+)
 
 import numpy as np
 from pedalboard import Resample
@@ -14,6 +27,436 @@ from pedalboard.io import AudioFile
 
 from .c_interface import TDHSAudioStretch
 
+try:
+    from .c_interface._audiostretch_cffi import ffi as _ffi
+    from .c_interface._audiostretch_cffi import lib as _pack_lib
+except ImportError:
+    _ffi = None
+    _pack_lib = None
+
+# float32 reciprocal so int16 -> float conversion multiplies instead of divides
+_INV32767 = np.float32(1.0 / 32767.0)
+# Scale Pedalboard uses between int16 PCM and float32
+_INV32768 = np.float32(1.0 / 32768.0)
+
+# Frames per channel passed to the C library per call: 64 KiB of stereo
+# int16, so the scratch buffers stay in L2 cache
+BLOCK_FRAMES = 16384
+
+# Blocks buffered between the reader, stretcher and writer threads
+PIPELINE_DEPTH = 2
+
+# Ratios closer to 1.0 than this are treated as 1.0 (no stretching), and
+# sample rates closer than SAMPLERATE_TOLERANCE Hz as equal (no resampling)
+RATIO_TOLERANCE = 1e-6
+SAMPLERATE_TOLERANCE = 1
+
+# Idle Resample plugins keyed by (input rate, output rate). A resampler is
+# taken out of the cache while in use, so threads never share one.
+_RESAMPLER_CACHE: Dict[Tuple[int, int], Resample] = {}
+_RESAMPLER_LOCK = threading.Lock()
+
+
+def _pack_int16(
+    samples: np.ndarray, out: np.ndarray, scratch: Optional[np.ndarray] = None
+) -> None:
+    """
+    Clip, scale and interleave (channels, frames) float samples into int16.
+
+    The scaled values are cast while being written through a transposed
+    view of ``out``, so no int16 temporary or interleaving copy is made.
+
+    Args:
+        samples: Float samples with shape (channels, frames)
+        out: Interleaved int16 output with channels * frames elements
+        scratch: Optional float32 buffer shaped like samples for the clipped
+            values (allocated if not given)
+    """
+    # Branchless min/max clip into the scratch buffer, no per-call allocation
+    clipped = np.maximum(samples, -1.0, out=scratch)
+    np.minimum(clipped, 1.0, out=clipped)
+    interleaved = out.reshape(-1, samples.shape[0]).T
+    np.multiply(clipped, 32767, out=interleaved, casting="unsafe")
+
+
+def _unpack_int16(samples_int16: np.ndarray, out: np.ndarray) -> None:
+    """
+    De-interleave and scale int16 samples into (channels, frames) float32.
+
+    Args:
+        samples_int16: Interleaved int16 samples
+        out: Float32 output with shape (channels, frames)
+    """
+    # Strided slices of each channel go straight into the contiguous rows
+    num_channels = out.shape[0]
+    for channel in range(num_channels):
+        np.multiply(samples_int16[channel::num_channels], _INV32767, out=out[channel])
+
+
+def _float_row(row: np.ndarray):
+    """Get a cffi float pointer to a row; rows of a block slice are contiguous."""
+    return _ffi.from_buffer("float[]", np.ascontiguousarray(row, dtype=np.float32))
+
+
+def _pack_mono(
+    samples: np.ndarray, out: np.ndarray, scratch: Optional[np.ndarray] = None
+) -> None:
+    """Pack mono float samples to int16 with the C kernel, see _pack_int16."""
+    _pack_lib.pack_mono_f32_to_i16(
+        _float_row(samples[0]), _ffi.from_buffer("int16_t[]", out), samples.shape[1]
+    )
+
+
+def _pack_stereo(
+    samples: np.ndarray, out: np.ndarray, scratch: Optional[np.ndarray] = None
+) -> None:
+    """Pack stereo float samples to interleaved int16 with the C kernel."""
+    _pack_lib.pack_stereo_f32_to_i16_interleaved(
+        _float_row(samples[0]),
+        _float_row(samples[1]),
+        _ffi.from_buffer("int16_t[]", out),
+        samples.shape[1],
+    )
+
+
+def _unpack_mono(samples_int16: np.ndarray, out: np.ndarray) -> None:
+    """Unpack mono int16 samples to float32 with the C kernel, see _unpack_int16."""
+    _pack_lib.unpack_i16_to_mono_f32(
+        _ffi.from_buffer("int16_t[]", samples_int16),
+        _ffi.from_buffer("float[]", out),
+        out.shape[1],
+    )
+
+
+def _unpack_stereo(samples_int16: np.ndarray, out: np.ndarray) -> None:
+    """Unpack interleaved stereo int16 samples to float32 with the C kernel."""
+    _pack_lib.unpack_i16_interleaved_to_stereo_f32(
+        _ffi.from_buffer("int16_t[]", samples_int16),
+        _ffi.from_buffer("float[]", out[0]),
+        _ffi.from_buffer("float[]", out[1]),
+        out.shape[1],
+    )
+
+
+# Conversion kernels by channel count, chosen once so the per-block calls
+# do not branch on the channel count or on the cffi module
+if _pack_lib is not None:
+    _PACKERS = {1: _pack_mono, 2: _pack_stereo}
+    _UNPACKERS = {1: _unpack_mono, 2: _unpack_stereo}
+else:
+    _PACKERS = {1: _pack_int16, 2: _pack_int16}
+    _UNPACKERS = {1: _unpack_int16, 2: _unpack_int16}
+
+
+def _is_unit_stretch(ratio: float, gap_ratio: float) -> bool:
+    """Check whether a stretch would leave the audio unchanged, see RATIO_TOLERANCE."""
+    effective_gap_ratio = gap_ratio if gap_ratio > 0 else ratio
+    return (
+        abs(ratio - 1.0) < RATIO_TOLERANCE
+        and abs(effective_gap_ratio - 1.0) < RATIO_TOLERANCE
+    )
+
+
+def _create_stretcher(
+    samplerate: int,
+    num_channels: int,
+    ratio: float,
+    upper_freq: int,
+    lower_freq: int,
+    double_range: bool,
+    fast_detection: bool,
+) -> TDHSAudioStretch:
+    """Create a TDHS stretcher with periods and flags for the given audio."""
+    min_period = max(1, int(samplerate / upper_freq))
+    max_period = int(samplerate / lower_freq)
+
+    flags = 0
+    if fast_detection:
+        flags |= TDHSAudioStretch.STRETCH_FAST_FLAG
+    if double_range or ratio < 0.5 or ratio > 2.0:
+        flags |= TDHSAudioStretch.STRETCH_DUAL_FLAG
+
+    return TDHSAudioStretch(min_period, max_period, num_channels, flags)
+
+
+def _stretch_interleaved(
+    stretcher: TDHSAudioStretch,
+    blocks: Iterable[np.ndarray],
+    num_channels: int,
+    ratio: float,
+    pack: Callable[..., None],
+    output_for: Callable[[int], np.ndarray],
+    block_int16: Optional[np.ndarray] = None,
+    block_float32: Optional[np.ndarray] = None,
+) -> Iterator[np.ndarray]:
+    """
+    Stretch blocks with the C library, yielding the interleaved int16 output.
+
+    Each block (at most BLOCK_FRAMES frames) is packed into a reused int16
+    buffer, so the int16 input working set stays cache sized. After the last
+    block the stretcher is flushed until it returns no more samples. int16
+    blocks (PCM read from 16-bit files) are only interleaved, float32 blocks
+    are also scaled.
+
+    Args:
+        stretcher: Initialized TDHS stretcher
+        blocks: float32 or int16 blocks with shape (channels, frames)
+        num_channels: Number of audio channels
+        ratio: Stretch ratio
+        pack: Float32 to int16 kernel for num_channels, from _PACKERS
+        output_for: Returns a contiguous int16 buffer with room for the
+            given number of frames, which the next call writes into
+        block_int16: Reusable int16 buffer of BLOCK_FRAMES * num_channels
+            samples, allocated if None
+        block_float32: Reusable float32 buffer of shape (num_channels,
+            BLOCK_FRAMES), allocated on first use if None
+
+    Yields:
+        Views of the buffers returned by output_for holding each call's output
+    """
+    if block_int16 is None:
+        block_int16 = np.empty(BLOCK_FRAMES * num_channels, dtype=np.int16)
+    block_capacity = stretcher.output_capacity(BLOCK_FRAMES, ratio)
+
+    for block in blocks:
+        num_block_frames = block.shape[1]
+        packed = block_int16[:num_block_frames * num_channels]
+        if block.dtype == np.int16:
+            packed.reshape(-1, num_channels).T[...] = block
+        else:
+            if block_float32 is None:
+                block_float32 = np.empty((num_channels, BLOCK_FRAMES), dtype=np.float32)
+            pack(block, packed, block_float32[:, :num_block_frames])
+        output = output_for(block_capacity)
+        num_output = stretcher.process_samples(packed, num_block_frames, output, ratio)
+        if num_output:
+            yield output[:num_output * num_channels]
+
+    # In dual mode the buffered samples come out over several flush calls
+    flush_capacity = stretcher.flush_capacity(ratio)
+    output = output_for(flush_capacity)
+    num_output = stretcher.flush(output)
+    while num_output:
+        yield output[:num_output * num_channels]
+        output = output_for(flush_capacity)
+        num_output = stretcher.flush(output)
+
+
+def _stretch_chunks(
+    stretcher: TDHSAudioStretch,
+    blocks: Iterable[np.ndarray],
+    num_channels: int,
+    ratio: float,
+    pack: Callable[..., None],
+    unpack: Callable[[np.ndarray, np.ndarray], None],
+    dtype: np.dtype,
+) -> Iterator[np.ndarray]:
+    """
+    Stretch blocks with the C library, yielding output chunks of the given dtype.
+
+    Every call writes into one reused int16 output buffer, see
+    _stretch_interleaved.
+
+    Args:
+        stretcher: Initialized TDHS stretcher
+        blocks: Blocks of dtype with shape (channels, frames)
+        num_channels: Number of audio channels
+        ratio: Stretch ratio
+        pack: Float32 to int16 kernel for num_channels, from _PACKERS
+        unpack: Int16 to float32 kernel for num_channels, from _UNPACKERS
+        dtype: np.int16 or np.float32
+
+    Yields:
+        Newly allocated chunks with shape (channels, frames)
+    """
+    # Large enough for one block as well as for the final flush
+    capacity = max(
+        stretcher.output_capacity(BLOCK_FRAMES, ratio), stretcher.flush_capacity(ratio)
+    )
+    output_int16 = np.empty(capacity * num_channels, dtype=np.int16)
+
+    for output in _stretch_interleaved(
+        stretcher, blocks, num_channels, ratio, pack, lambda _: output_int16
+    ):
+        if dtype == np.int16:
+            yield output.reshape(-1, num_channels).T.copy()
+        else:
+            num_output = output.size // num_channels
+            chunk = np.empty((num_channels, num_output), dtype=np.float32)
+            unpack(output, chunk)
+            yield chunk
+
+
+def _put(q: queue.Queue, item: object, stop: threading.Event) -> bool:
+    """Put an item on a bounded queue unless the pipeline is being stopped."""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def _drain(q: queue.Queue, stop: threading.Event) -> Iterator[np.ndarray]:
+    """Yield items from a queue until a None item or the pipeline is stopped."""
+    while not stop.is_set():
+        try:
+            item = q.get(timeout=0.1)
+        except queue.Empty:
+            continue
+        if item is None:
+            return
+        yield item
+
+
+def _is_same_file(path: Union[str, Path], other: Union[str, Path]) -> bool:
+    """Check whether two paths refer to the same existing file."""
+    try:
+        return os.path.samefile(path, other)
+    except OSError:
+        return False
+
+
+def _open_output(
+    path: Path, output_path: Path, samplerate: float, num_channels: int
+) -> AudioFile:
+    """Open path for writing, reporting failures against output_path."""
+    try:
+        return AudioFile(
+            str(path), "w", samplerate=samplerate, num_channels=num_channels
+        )
+    except Exception as e:
+        raise IOError(f"Could not save audio file to {output_path}: {e}") from e
+
+
+def _pipelined_stretch(
+    input_path: Union[str, Path],
+    output_path: Union[str, Path],
+    ratio: float = 1.0,
+    upper_freq: int = 333,
+    lower_freq: int = 55,
+    double_range: bool = False,
+    fast_detection: bool = False,
+) -> None:
+    """
+    Stretch an audio file while it is decoded and encoded in background threads.
+
+    A reader thread decodes blocks of BLOCK_FRAMES frames and a writer
+    thread encodes the stretched chunks, connected to the stretching loop
+    by queues of PIPELINE_DEPTH items. Pedalboard and the C library release
+    the GIL, so decoding, stretching and encoding overlap, and only a few
+    blocks are held in memory at a time. The output is only replaced once
+    the whole file has been written.
+
+    Args:
+        input_path: Path to input audio file
+        output_path: Path for output audio file
+        ratio: Stretch ratio (>1.0 = slower, <1.0 = faster)
+        upper_freq: Upper frequency limit for period detection (Hz)
+        lower_freq: Lower frequency limit for period detection (Hz)
+        double_range: Enable extended ratio range (0.25-4.0)
+        fast_detection: Use faster period detection algorithm
+
+    Raises:
+        ValueError: If the ratio or channel count is not supported
+        RuntimeError: If the stretcher cannot be initialized
+        IOError: If the files cannot be read or written
+    """
+    if ratio <= 0:
+        raise ValueError("Stretch ratio must be positive")
+
+    try:
+        infile = AudioFile(str(input_path))
+    except Exception as e:
+        raise IOError(f"Could not open audio file {input_path}: {e}") from e
+
+    with infile:
+        samplerate = infile.samplerate
+        num_channels = infile.num_channels
+        if num_channels not in _PACKERS:
+            raise ValueError(f"Unsupported channel count: {num_channels}")
+
+        # Everything that can reject the parameters runs before the output
+        # is touched
+        stretcher = _create_stretcher(
+            samplerate, num_channels, ratio, upper_freq, lower_freq,
+            double_range, fast_detection,
+        )
+
+        blocks: queue.Queue = queue.Queue(maxsize=PIPELINE_DEPTH)
+        chunks: queue.Queue = queue.Queue(maxsize=PIPELINE_DEPTH)
+        stop = threading.Event()
+        errors = []
+
+        # 16-bit PCM is passed through as int16, without float conversion
+        raw = infile.file_dtype == "int16"
+        read_block = infile.read_raw if raw else infile.read
+
+        def read() -> None:
+            try:
+                while infile.tell() < infile.frames:
+                    if not _put(blocks, read_block(BLOCK_FRAMES), stop):
+                        return
+                _put(blocks, None, stop)
+            except Exception as e:
+                errors.append(e)
+                stop.set()
+
+        def write(outfile: AudioFile) -> None:
+            try:
+                for chunk in _drain(chunks, stop):
+                    outfile.write(chunk)
+            except Exception as e:
+                errors.append(e)
+                stop.set()
+
+        # The output is written to a file next to it and moved into place
+        # once complete, so a failure never truncates an existing output
+        output_path = Path(output_path)
+        partial_path = output_path.with_name(
+            f".{output_path.stem}.{uuid.uuid4().hex[:8]}.partial{output_path.suffix}"
+        )
+        try:
+            with _open_output(
+                partial_path, output_path, samplerate, num_channels
+            ) as outfile:
+                threads = [
+                    threading.Thread(target=read),
+                    threading.Thread(target=write, args=(outfile,)),
+                ]
+                for thread in threads:
+                    thread.start()
+                try:
+                    block_iter = _drain(blocks, stop)
+                    chunk_iter = _stretch_chunks(
+                        stretcher, block_iter, num_channels, ratio,
+                        _PACKERS[num_channels], _UNPACKERS[num_channels],
+                        np.int16 if raw else np.float32,
+                    )
+                    for chunk in chunk_iter:
+                        if not _put(chunks, chunk, stop):
+                            break
+                    _put(chunks, None, stop)
+                except BaseException:
+                    stop.set()
+                    raise
+                finally:
+                    for thread in threads:
+                        thread.join()
+
+            if errors:
+                raise IOError(
+                    f"Could not stretch {input_path} to {output_path}: {errors[0]}"
+                ) from errors[0]
+            os.replace(partial_path, output_path)
+        except BaseException:
+            if partial_path.exists():
+                partial_path.unlink()
+            raise
+        finally:
+            stretcher.deinit()
+
 
 class AudioStretch:
     """
@@ -23,9 +466,48 @@ class AudioStretch:
 
     def __init__(self):
         """Initialize AudioStretch processor."""
-        self.samples: Optional[np.ndarray] = None
+        self._samples: Optional[np.ndarray] = None
+        # int16 PCM samples of 16-bit sources, kept until samples is read
+        self._samples_int16: Optional[np.ndarray] = None
         self.samplerate: int = 44100
-        self.num_channels: int = 1
+        self.num_channels = 1
+        # Stretch buffers reused across calls, see _ensure_scratch
+        self._scratch_i16_in: Optional[np.ndarray] = None
+        self._scratch_f32: Optional[np.ndarray] = None
+        self._scratch_i16_out: Optional[np.ndarray] = None
+
+    @property
+    def samples(self) -> Optional[np.ndarray]:
+        """Float32 samples with shape (channels, frames), or None if not loaded."""
+        if self._samples is None and self._samples_int16 is not None:
+            self._samples = np.multiply(
+                self._samples_int16, _INV32768, dtype=np.float32
+            )
+            # The handed out array becomes the only copy, so that in-place
+            # edits to it are seen by stretch() and save()
+            self._samples_int16 = None
+        return self._samples
+
+    @samples.setter
+    def samples(self, samples: Optional[np.ndarray]) -> None:
+        self._samples = samples
+        self._samples_int16 = None
+
+    @property
+    def num_channels(self) -> int:
+        """Number of audio channels."""
+        return self._num_channels
+
+    @num_channels.setter
+    def num_channels(self, num_channels: int) -> None:
+        # Select the conversion kernels once per channel count, not per block
+        self._num_channels = num_channels
+        self._pack = _PACKERS.get(num_channels)
+        self._unpack = _UNPACKERS.get(num_channels)
+
+    def _has_samples(self) -> bool:
+        """Check for loaded samples without converting int16 samples to float32."""
+        return self._samples is not None or self._samples_int16 is not None
         
     def open(
         self,
@@ -39,7 +521,7 @@ class AudioStretch:
         Args:
             path: Path to the audio file
             file: Binary I/O object containing audio data
-            format: Audio format hint (usually inferred from extension)
+            format: Audio format hint (unused, Pedalboard detects the format)
         
         Raises:
             ValueError: If neither path nor file is provided
@@ -51,9 +533,14 @@ class AudioStretch:
         input_source = file if file is not None else str(path)
         
         try:
-            with AudioFile(input_source, format=format) as f:
-                # Read all audio data into memory
-                self.samples = f.read(f.frames)
+            with AudioFile(input_source) as f:
+                # Read all audio data into memory, 16-bit PCM as int16
+                if f.file_dtype == "int16":
+                    samples_int16 = f.read_raw(f.frames)
+                    self.samples = None
+                    self._samples_int16 = samples_int16
+                else:
+                    self.samples = f.read(f.frames)
                 self.samplerate = f.samplerate
                 self.num_channels = f.num_channels
                 
@@ -73,7 +560,7 @@ class AudioStretch:
         Args:
             path: Path to save the audio file
             file: Binary I/O object to write audio data
-            format: Audio format (inferred from path extension if not specified)
+            format: Audio format of a file object (paths use their extension)
             
         Raises:
             ValueError: If no audio data or invalid parameters
@@ -82,24 +569,33 @@ class AudioStretch:
         if path is None and file is None:
             raise ValueError("Either path or file must be provided")
             
-        if self.samples is None:
+        if not self._has_samples():
             raise ValueError("No audio data to save. Call open() and process first")
             
-        output_target = file if file is not None else str(path)
-        
-        # Infer format from path extension if not specified
-        if format is None and path is not None:
-            format = Path(path).suffix.lstrip(".")
-            
+        # Pedalboard infers the format of paths from their extension and only
+        # accepts a format for file objects
+        if file is not None:
+            output_target = file
+            format_args = {"format": format} if format else {}
+        else:
+            output_target = str(path)
+            format_args = {}
+
+        # int16 samples are written as they are, without a float round trip
+        if self._samples is None:
+            samples = self._samples_int16
+        else:
+            samples = self._samples
+
         try:
             with AudioFile(
                 output_target,
                 mode="w",
                 samplerate=self.samplerate,
                 num_channels=self.num_channels,
-                format=format,
+                **format_args,
             ) as f:
-                f.write(self.samples)
+                f.write(samples)
                 
         except Exception as e:
             target_desc = str(path) if path else "file object"
@@ -109,22 +605,33 @@ class AudioStretch:
         """
         Resample audio to target sample rate using Pedalboard.
 
+        Rates within SAMPLERATE_TOLERANCE of the current one are left as is.
+
         Args:
             target_samplerate: Target sample rate in Hz
             
         Raises:
             ValueError: If no audio data is loaded
         """
-        if self.samples is None:
+        if not self._has_samples():
             raise ValueError("No audio data to resample. Call open() first")
             
-        if target_samplerate == self.samplerate:
+        if abs(target_samplerate - self.samplerate) < SAMPLERATE_TOLERANCE:
             return  # No resampling needed
             
-        resampler = Resample(target_sample_rate=target_samplerate)
-        self.samples = resampler(self.samples, sample_rate=self.samplerate)
+        key = (self.samplerate, target_samplerate)
+        with _RESAMPLER_LOCK:
+            resampler = _RESAMPLER_CACHE.pop(key, None)
+        if resampler is None:
+            resampler = Resample(target_sample_rate=target_samplerate)
+
+        # reset=True (the default) clears the filter state left by earlier calls
+        self.samples = resampler(self.samples, sample_rate=self.samplerate, reset=True)
         self.samplerate = target_samplerate
 
+        with _RESAMPLER_LOCK:
+            _RESAMPLER_CACHE[key] = resampler
+
     def stretch(
         self,
         ratio: float = 1.0,
@@ -140,6 +647,8 @@ class AudioStretch:
         """
         Stretch audio using the TDHS algorithm.
 
+        Ratios within RATIO_TOLERANCE of 1.0 leave the audio unchanged.
+
         Args:
             ratio: Stretch ratio (>1.0 = slower, <1.0 = faster)
             gap_ratio: Separate ratio for silent sections (0.0 = use main ratio)
@@ -159,107 +668,169 @@ class AudioStretch:
             gap_ratio, buffer_ms, threshold_gap_db are not currently implemented
             in this Python wrapper and require additional segmentation logic.
         """
-        if self.samples is None:
+        if not self._has_samples():
             raise ValueError("No audio data to stretch. Call open() first")
             
         if ratio <= 0:
             raise ValueError("Stretch ratio must be positive")
             
-        # Skip processing if no change needed
-        effective_gap_ratio = gap_ratio if gap_ratio > 0 else ratio
-        if ratio == 1.0 and effective_gap_ratio == 1.0:
+        # Skip processing if no change needed, allowing for float drift
+        if _is_unit_stretch(ratio, gap_ratio):
             return
             
-        # Convert float32 samples to int16 for C library
-        samples_int16 = self._convert_to_int16(self.samples)
-        
-        # Set up TDHS parameters
-        min_period = max(1, int(self.samplerate / upper_freq))
-        max_period = int(self.samplerate / lower_freq)
-        
-        flags = 0
-        if fast_detection:
-            flags |= TDHSAudioStretch.STRETCH_FAST_FLAG
-        if double_range or ratio < 0.5 or ratio > 2.0:
-            flags |= TDHSAudioStretch.STRETCH_DUAL_FLAG
-            
-        # Initialize stretcher
-        stretcher = TDHSAudioStretch(min_period, max_period, self.num_channels, flags)
+        if self._pack is None:
+            raise ValueError(f"Unsupported channel count: {self.num_channels}")
+
+        stretcher = _create_stretcher(
+            self.samplerate, self.num_channels, ratio, upper_freq, lower_freq,
+            double_range, fast_detection,
+        )
         
         try:
-            # Process audio
-            output_samples = self._process_with_stretcher(stretcher, samples_int16, ratio)
-            
-            # Convert back to float32 and update samples
-            self.samples = self._convert_from_int16(output_samples)
-            
+            if self._samples_int16 is not None:
+                samples_int16 = self._stretch_blocks(
+                    stretcher, self._samples_int16, ratio
+                )
+                self.samples = None
+                self._samples_int16 = samples_int16
+            else:
+                self.samples = self._stretch_blocks(stretcher, self.samples, ratio)
         finally:
             stretcher.deinit()
 
     def _convert_to_int16(self, samples: np.ndarray) -> np.ndarray:
-        """Convert float32 samples to int16 format expected by C library."""
-        # Clip to valid range and convert
-        samples_clipped = np.clip(samples, -1.0, 1.0)
-        samples_int16 = (samples_clipped * 32767).astype(np.int16)
-        
-        # Interleave channels if stereo
-        if self.num_channels == 1:
-            return np.ascontiguousarray(samples_int16[0])
-        elif self.num_channels == 2:
-            # Interleave L,R,L,R...
-            return np.ascontiguousarray(samples_int16.T.ravel())
-        else:
+        """Convert float32 samples to interleaved int16 (L,R,L,R...) for the library."""
+        if self._pack is None:
             raise ValueError(f"Unsupported channel count: {self.num_channels}")
 
+        samples_int16 = np.empty(samples.size, dtype=np.int16)
+        self._pack(samples, samples_int16)
+        return samples_int16
+
     def _convert_from_int16(self, samples_int16: np.ndarray) -> np.ndarray:
-        """Convert int16 samples back to float32 format."""
-        samples_float32 = samples_int16.astype(np.float32) / 32767.0
-        
-        # De-interleave channels if stereo
-        if self.num_channels == 1:
-            return samples_float32.reshape(1, -1)
-        elif self.num_channels == 2:
-            # De-interleave L,R,L,R... to (2, N)
-            return samples_float32.reshape(-1, 2).T
-        else:
+        """Convert interleaved int16 samples back to (channels, frames) float32."""
+        if self._pack is None:
             raise ValueError(f"Unsupported channel count: {self.num_channels}")
 
-    def _process_with_stretcher(
-        self, 
+        samples_float32 = np.empty(
+            (self.num_channels, len(samples_int16) // self.num_channels),
+            dtype=np.float32,
+        )
+        self._unpack(
+            np.ascontiguousarray(samples_int16, dtype=np.int16), samples_float32
+        )
+        return samples_float32
+
+    def _ensure_scratch(
+        self,
+        n_in_frames: int,
+        n_out_frames: int,
+        keep: int = 0,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Return the stretch scratch buffers, growing them only when too small.
+
+        The block buffers belong to the instance, so repeated stretch() calls
+        do not allocate them again once they are large enough. The output
+        buffer grows to at least twice its size, keeping its first keep
+        samples; it is full length, so _stretch_blocks releases it when done.
+
+        Args:
+            n_in_frames: Frames per block to be packed
+            n_out_frames: Frames the output buffer must hold
+            keep: Samples of the output buffer to preserve when it grows
+
+        Returns:
+            Tuple of interleaved int16 block, float32 block with shape
+            (channels, n_in_frames) and interleaved int16 output buffers
+        """
+        num_channels = self.num_channels
+        n_in = n_in_frames * num_channels
+        n_out = n_out_frames * num_channels
+
+        if self._scratch_i16_in is None or self._scratch_i16_in.size < n_in:
+            self._scratch_i16_in = np.empty(n_in, dtype=np.int16)
+            self._scratch_f32 = np.empty(n_in, dtype=np.float32)
+
+        out = self._scratch_i16_out
+        if out is None or out.size < n_out:
+            size = n_out if out is None else max(n_out, 2 * out.size)
+            grown = np.empty(size, dtype=np.int16)
+            if keep:
+                grown[:keep] = out[:keep]
+            self._scratch_i16_out = grown
+
+        return (
+            self._scratch_i16_in[:n_in],
+            self._scratch_f32[:n_in].reshape(num_channels, n_in_frames),
+            self._scratch_i16_out,
+        )
+
+    def _stretch_blocks(
+        self,
         stretcher: TDHSAudioStretch,
-        samples_int16: np.ndarray,
-        ratio: float
+        samples: np.ndarray,
+        ratio: float,
     ) -> np.ndarray:
-        """Process samples using the TDHS stretcher."""
-        num_input_frames = len(samples_int16) // self.num_channels
-        
-        # Calculate output buffer capacity
-        max_ratio_for_capacity = 4.0 if ratio > 2.0 or ratio < 0.5 else 2.0
-        effective_max_ratio = max(ratio, max_ratio_for_capacity if ratio > 1.0 else 1.0 / ratio)
-        
-        output_capacity = stretcher.output_capacity(num_input_frames, effective_max_ratio)
-        output_buffer = np.zeros(output_capacity * self.num_channels, dtype=np.int16)
-        
-        # Process samples
-        num_processed = stretcher.process_samples(
-            samples_int16, num_input_frames, output_buffer, ratio
+        """
+        Stretch samples by passing them to the C library in blocks.
+
+        The library writes straight into the int16 output buffer of
+        _ensure_scratch, sized for the whole output, which is then unpacked
+        once into the float32 output (or deinterleaved for int16 samples),
+        without per-block chunks or a concatenation.
+
+        Args:
+            stretcher: Initialized TDHS stretcher
+            samples: float32 or int16 samples with shape (channels, frames)
+            ratio: Stretch ratio
+
+        Returns:
+            Stretched samples of the same dtype with shape (channels, frames)
+        """
+        num_channels = self.num_channels
+        num_frames = samples.shape[1]
+        capacity = stretcher.output_capacity(num_frames, ratio)
+        capacity += stretcher.flush_capacity(ratio)
+        block_int16, block_float32, _ = self._ensure_scratch(BLOCK_FRAMES, capacity)
+        end = 0
+
+        def output_for(num_output: int) -> np.ndarray:
+            # Not expected to grow given the capacity above, but never overrun
+            _, _, result = self._ensure_scratch(
+                BLOCK_FRAMES, end // num_channels + num_output, keep=end
+            )
+            return result[end:]
+
+        blocks = (
+            samples[:, start : start + BLOCK_FRAMES]
+            for start in range(0, num_frames, BLOCK_FRAMES)
         )
-        
-        # Flush remaining samples
-        flush_buffer = np.zeros(output_capacity * self.num_channels, dtype=np.int16)
-        num_flushed = stretcher.flush(flush_buffer)
-        
-        # Combine processed and flushed samples
-        total_samples = num_processed + num_flushed
-        result = np.zeros(total_samples * self.num_channels, dtype=np.int16)
-        
-        processed_size = num_processed * self.num_channels
-        flushed_size = num_flushed * self.num_channels
-        
-        result[:processed_size] = output_buffer[:processed_size]
-        result[processed_size:processed_size + flushed_size] = flush_buffer[:flushed_size]
-        
-        return result
+        try:
+            for output in _stretch_interleaved(
+                stretcher,
+                blocks,
+                num_channels,
+                ratio,
+                self._pack,
+                output_for,
+                block_int16,
+                block_float32,
+            ):
+                end += output.size
+
+            interleaved = self._scratch_i16_out[:end]
+            if samples.dtype == np.int16:
+                return interleaved.reshape(-1, num_channels).T.copy()
+
+            samples_float32 = np.empty(
+                (num_channels, end // num_channels), dtype=np.float32
+            )
+            self._unpack(interleaved, samples_float32)
+            return samples_float32
+        finally:
+            # Do not keep a full-length buffer alive between calls
+            self._scratch_i16_out = None
 
 
 def stretch_audio(
@@ -293,6 +864,24 @@ def stretch_audio(
         normal_detection: Force normal detection (currently unused)
         sample_rate: Target sample rate for output (0 = keep original)
     """
+    # Without resampling the file can be streamed through the stretcher,
+    # unless that would overwrite the input while it is still being read
+    if (
+        sample_rate <= 0
+        and not _is_unit_stretch(ratio, gap_ratio)
+        and not _is_same_file(input_path, output_path)
+    ):
+        _pipelined_stretch(
+            input_path,
+            output_path,
+            ratio=ratio,
+            upper_freq=upper_freq,
+            lower_freq=lower_freq,
+            double_range=double_range,
+            fast_detection=fast_detection,
+        )
+        return
+
     processor = AudioStretch()
     
     # Load audio
@@ -312,7 +901,7 @@ def stretch_audio(
     )
     
     # Resample if requested
-    if sample_rate > 0 and sample_rate != processor.samplerate:
+    if sample_rate > 0:
         processor.resample(sample_rate)
     
     # Save result
@@ -15,6 +15,9 @@ from pedalboard.io import (
 # If fully replaced, this import and the vendors/stretch submodule might be removable later.
 from .interface.tdhs import TDHSAudioStretch
 
+# As in core.py
+_INV32767 = np.float32(1.0 / 32767.0)
+
 
 class AudioStretch:
     """
@@ -284,7 +287,8 @@ class AudioStretch:
         out_capacity = stretcher.output_capacity(
             num_input_frames_per_channel, max_effective_ratio_for_capacity
         )
-        pcm_data_out = np.zeros(out_capacity * self.nchannels, dtype=np.int16)
+        # The C library writes every sample it reports, no zero-fill needed
+        pcm_data_out = np.empty(out_capacity * self.nchannels, dtype=np.int16)
 
         num_processed_frames = stretcher.process_samples(
             pcm_data_in, num_input_frames_per_channel, pcm_data_out, ratio
@@ -293,7 +297,7 @@ class AudioStretch:
         # Flush any remaining samples
         # The flush buffer needs to be large enough.
         # Output_capacity should also cover typical flush sizes from TDHS.
-        pcm_data_flush_out = np.zeros(
+        pcm_data_flush_out = np.empty(
             out_capacity * self.nchannels, dtype=np.int16
         )  # Re-use capacity estimate
         num_flushed_frames = stretcher.flush(pcm_data_flush_out)
@@ -310,8 +314,8 @@ class AudioStretch:
 
         # Convert back to float32 and de-interleave
         # TDHS output is also int16, interleaved
-        float32_output_samples = (
-            actual_output_samples_int16.astype(np.float32) / 32767.0
+        float32_output_samples = np.multiply(
+            actual_output_samples_int16, _INV32767, dtype=np.float32
         )
 
         if self.nchannels == 1:
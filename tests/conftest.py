@@ -7,6 +7,7 @@ This file contains shared fixtures and test utilities for the audiostretchy test
 import pytest
 import tempfile
 import shutil
+from collections.abc import Mapping
 from pathlib import Path
 import soundfile as sf
 import numpy as np
@@ -23,60 +24,72 @@ def temp_audio_dir():
 @pytest.fixture(scope="session")
 def sample_audio_generator():
     """Generate sample audio data for testing."""
+    cache = {}
+
     def generate_audio(
         duration_seconds=1.0, 
         sample_rate=44100, 
         channels=2, 
         frequency=440.0
     ):
-        """Generate a sine wave audio sample."""
-        num_samples = int(duration_seconds * sample_rate)
-        t = np.linspace(0, duration_seconds, num_samples, False)
-        
-        # Generate sine wave
-        audio = np.sin(2 * np.pi * frequency * t)
-        
-        # Convert to stereo if needed
-        if channels == 2:
-            audio = np.stack([audio, audio])
-        elif channels == 1:
-            audio = audio.reshape(1, -1)
-        
-        return audio.astype(np.float32)
+        """Generate a read-only sine wave audio sample, cached per session."""
+        key = (duration_seconds, sample_rate, channels, frequency)
+        if key not in cache:
+            num_samples = int(duration_seconds * sample_rate)
+            t = np.arange(num_samples, dtype=np.float32) * np.float32(1.0 / sample_rate)
+
+            # Generate sine wave
+            audio = np.sin(np.float32(2 * np.pi * frequency) * t)
+
+            # Every channel is a zero-copy view of the same signal
+            cache[key] = np.broadcast_to(audio, (channels, num_samples))
+
+        return cache[key]
     
     return generate_audio
 
 
+class LazyAudioFiles(Mapping):
+    """Map test file names to WAV paths, writing each file on first access."""
+
+    def __init__(self, directory, signals, sample_rate=44100):
+        self.directory = directory
+        self.signals = signals
+        self.sample_rate = sample_rate
+
+    def __getitem__(self, name):
+        path = self.directory / f"{name[:-len('_wav')]}_test.wav"
+        if not path.exists():
+            sf.write(path, self.signals[name].T, self.sample_rate, subtype="PCM_16")
+        return path
+
+    def __iter__(self):
+        return iter(self.signals)
+
+    def __len__(self):
+        return len(self.signals)
+
+
 @pytest.fixture(scope="session")
 def generate_test_files(temp_audio_dir, sample_audio_generator):
     """Generate test audio files in various formats."""
-    test_files = {}
-    
     # Generate mono and stereo audio
     mono_audio = sample_audio_generator(channels=1)
     stereo_audio = sample_audio_generator(channels=2)
     
-    # Create WAV files
-    mono_wav = temp_audio_dir / "mono_test.wav"
-    stereo_wav = temp_audio_dir / "stereo_test.wav"
-    
-    sf.write(mono_wav, mono_audio.T, 44100)
-    sf.write(stereo_wav, stereo_audio.T, 44100)
-    
-    test_files['mono_wav'] = mono_wav
-    test_files['stereo_wav'] = stereo_wav
-    
     # Generate audio with silence (for gap_ratio testing)
     silent_audio = sample_audio_generator(duration_seconds=0.5, frequency=0)  # silence
     normal_audio = sample_audio_generator(duration_seconds=0.5, frequency=440)  # tone
     
     # Concatenate: tone -> silence -> tone
     gapped_audio = np.concatenate([normal_audio, silent_audio, normal_audio], axis=1)
-    gapped_wav = temp_audio_dir / "gapped_test.wav"
-    sf.write(gapped_wav, gapped_audio.T, 44100)
-    test_files['gapped_wav'] = gapped_wav
     
-    return test_files
+    # WAVs are only encoded when a test asks for their path
+    return LazyAudioFiles(temp_audio_dir, {
+        'mono_wav': mono_audio,
+        'stereo_wav': stereo_audio,
+        'gapped_wav': gapped_audio,
+    })
 
 
 @pytest.fixture
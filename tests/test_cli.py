@@ -1,37 +1,38 @@
+import io
 import pytest
 import subprocess
 import sys
+from contextlib import redirect_stdout
 from pathlib import Path
 
+import audiostretchy
+from audiostretchy.__main__ import main
+
 
 def test_cli_help():
     """Test that the CLI shows help information."""
-    result = subprocess.run(
-        [sys.executable, "-m", "audiostretchy", "--help"],
-        capture_output=True,
-        text=True
-    )
+    with redirect_stdout(io.StringIO()) as stdout:
+        with pytest.raises(SystemExit) as exc_info:
+            main(["--help"])
     
     # Should exit with code 0 and show help
-    assert result.returncode == 0
-    assert "audiostretchy" in result.stdout.lower()
+    assert exc_info.value.code == 0
+    assert "audiostretchy" in stdout.getvalue().lower()
 
 
 def test_cli_version():
     """Test that the CLI can show version information."""
-    result = subprocess.run(
-        [sys.executable, "-c", "import audiostretchy; print(audiostretchy.__version__)"],
-        capture_output=True,
-        text=True
-    )
+    with redirect_stdout(io.StringIO()) as stdout:
+        with pytest.raises(SystemExit) as exc_info:
+            main(["--version"])
     
-    # Should exit with code 0 and show version
-    assert result.returncode == 0
-    assert result.stdout.strip()  # Version should be non-empty
+    # Should exit with code 0 and show the version
+    assert exc_info.value.code == 0
+    assert str(audiostretchy.__version__) in stdout.getvalue()
 
 
 def test_cli_stretch_audio(generate_test_files, tmp_path):
-    """Test the CLI with actual audio files."""
+    """Test the CLI end to end in a separate interpreter."""
     input_file = generate_test_files['stereo_wav']
     output_file = tmp_path / "cli_output.wav"
     
@@ -60,8 +61,7 @@ def test_cli_with_all_parameters(generate_test_files, tmp_path):
     output_file = tmp_path / "cli_full_params.wav"
     
     # Run CLI with many parameters
-    result = subprocess.run([
-        sys.executable, "-m", "audiostretchy",
+    main([
         str(input_file),
         str(output_file),
         "--ratio", "1.3",
@@ -69,10 +69,9 @@ def test_cli_with_all_parameters(generate_test_files, tmp_path):
         "--lower_freq", "60", 
         "--fast_detection", "True",
         "--sample_rate", "22050"
-    ], capture_output=True, text=True)
+    ])
     
     # Should succeed
-    assert result.returncode == 0
     assert output_file.exists()
     
     # Verify resampling worked
@@ -64,6 +64,20 @@ class TestAudioStretch:
         # Samples should be unchanged
         np.testing.assert_array_equal(processor.samples, original_samples)
     
+    def test_stretch_near_unit_ratio_is_noop(self):
+        """Test that ratios within float drift of 1.0 skip processing."""
+        processor = AudioStretch()
+        original_samples = np.random.random((1, 1000)).astype(np.float32)
+        processor.samples = original_samples
+        processor.samplerate = 44100
+        processor.num_channels = 1
+
+        processor.stretch(1.0 + 1e-9)
+        processor.resample(44100.5)
+
+        assert processor.samples is original_samples
+        assert processor.samplerate == 44100
+    
     def test_resample_no_data(self):
         """Test error handling when resampling without data."""
         processor = AudioStretch()
@@ -84,6 +98,43 @@ class TestAudioStretch:
         # Samples should be unchanged
         np.testing.assert_array_equal(processor.samples, original_samples)
     
+    def test_resample_reuses_resampler(self):
+        """Test that cached resamplers give the same result as fresh ones."""
+        from audiostretchy import core
+
+        samples = np.random.random((2, 4410)).astype(np.float32) - 0.5
+        results = []
+        for _ in range(2):
+            processor = AudioStretch()
+            processor.samples = samples.copy()
+            processor.samplerate = 44100
+            processor.num_channels = 2
+            processor.resample(22050)
+            results.append(processor.samples)
+
+        assert (44100, 22050) in core._RESAMPLER_CACHE
+        np.testing.assert_array_equal(results[0], results[1])
+    
+    def test_stretch_reuses_scratch_buffers(self):
+        """Test that repeated stretches reuse the instance's block buffers."""
+        samples = np.random.random((2, 44100)).astype(np.float32) - 0.5
+        processor = AudioStretch()
+        processor.num_channels = 2
+
+        processor.samples = samples
+        processor.stretch(1.2)
+        first = processor.samples
+        scratch_in = processor._scratch_i16_in
+
+        processor.samples = samples
+        processor.stretch(1.2)
+
+        assert processor._scratch_i16_in is scratch_in
+        # The full-length output buffer is released after each call
+        assert processor._scratch_i16_out is None
+        assert not np.shares_memory(processor.samples, first)
+        np.testing.assert_array_equal(processor.samples, first)
+    
     def test_convert_to_int16_mono(self):
         """Test float32 to int16 conversion for mono audio."""
         processor = AudioStretch()
@@ -157,6 +208,169 @@ class TestAudioStretch:
         with pytest.raises(ValueError, match="Unsupported channel count: 3"):
             processor._convert_from_int16(int16_samples)
 
+    @pytest.mark.parametrize("num_channels", [1, 2])
+    def test_c_pack_kernels_match_numpy(self, num_channels):
+        """Test that the C conversion kernels match the numpy fallback."""
+        from audiostretchy import core
+
+        if core._pack_lib is None:
+            pytest.skip("cffi extension module is not built")
+
+        rng = np.random.default_rng(0)
+        float_samples = rng.uniform(-1.5, 1.5, (num_channels, 1001)).astype(np.float32)
+
+        int16_c = np.empty(float_samples.size, dtype=np.int16)
+        core._PACKERS[num_channels](float_samples, int16_c)
+        int16_numpy = np.empty(float_samples.size, dtype=np.int16)
+        core._pack_int16(float_samples, int16_numpy)
+        np.testing.assert_array_equal(int16_c, int16_numpy)
+
+        float_c = np.empty_like(float_samples)
+        core._UNPACKERS[num_channels](int16_c, float_c)
+        float_numpy = np.empty_like(float_samples)
+        core._unpack_int16(int16_c, float_numpy)
+        np.testing.assert_array_equal(float_c, float_numpy)
+
+
+def test_pipelined_stretch_matches_in_memory(tmp_path):
+    """Test that the threaded file pipeline matches in-memory stretching."""
+    from pedalboard.io import AudioFile
+
+    from audiostretchy.core import _pipelined_stretch
+
+    input_path = Path(__file__).parent / "audio.wav"
+    piped_path = tmp_path / "piped.wav"
+    expected_path = tmp_path / "expected.wav"
+
+    _pipelined_stretch(input_path, piped_path, ratio=1.3)
+
+    processor = AudioStretch()
+    processor.open(input_path)
+    processor.stretch(1.3)
+    processor.save(expected_path)
+
+    with AudioFile(str(piped_path)) as piped, AudioFile(str(expected_path)) as expected:
+        assert piped.samplerate == expected.samplerate
+        np.testing.assert_array_equal(
+            piped.read_raw(piped.frames), expected.read_raw(expected.frames)
+        )
+
+
+def test_stretch_audio_in_place(tmp_path):
+    """Test that stretching a file onto itself reads it fully before writing."""
+    import shutil
+
+    from pedalboard.io import AudioFile
+
+    input_path = Path(__file__).parent / "audio.wav"
+    in_place_path = tmp_path / "in_place.wav"
+    expected_path = tmp_path / "expected.wav"
+    shutil.copy(input_path, in_place_path)
+
+    stretch_audio(in_place_path, in_place_path, ratio=1.3)
+    stretch_audio(input_path, expected_path, ratio=1.3)
+
+    with AudioFile(str(in_place_path)) as actual, AudioFile(
+        str(expected_path)
+    ) as expected:
+        assert actual.frames == expected.frames
+        np.testing.assert_array_equal(
+            actual.read_raw(actual.frames), expected.read_raw(expected.frames)
+        )
+
+
+def test_failed_stretch_leaves_output_untouched(tmp_path):
+    """Test that a stretch failing to start does not truncate an existing output."""
+    output_path = tmp_path / "existing.wav"
+    output_path.write_bytes(b"previous output")
+
+    with pytest.raises(RuntimeError):
+        stretch_audio(
+            Path(__file__).parent / "audio.wav",
+            output_path,
+            ratio=1.2,
+            upper_freq=40000,
+        )
+
+    assert output_path.read_bytes() == b"previous output"
+    assert list(tmp_path.iterdir()) == [output_path]
+
+
+def test_pcm16_source_stays_int16(tmp_path):
+    """Test that 16-bit sources are stretched and saved without float conversion."""
+    processor = AudioStretch()
+    processor.open(Path(__file__).parent / "audio.wav")
+    assert processor._samples_int16.dtype == np.int16
+    assert processor._samples is None
+
+    processor.stretch(1.2)
+    assert processor._samples_int16.dtype == np.int16
+    assert processor._samples is None
+
+    # Float32 samples are still available on demand
+    shape = processor._samples_int16.shape
+    assert processor.samples.dtype == np.float32
+    assert processor.samples.shape == shape
+
+
+def test_in_place_edits_of_pcm16_samples_are_kept():
+    """Test that edits to samples read from a 16-bit source are not ignored."""
+    processor = AudioStretch()
+    processor.open(Path(__file__).parent / "audio.wav")
+    processor.samples[:] = 0
+
+    processor.stretch(1.2)
+    assert not processor.samples.any()
+
+
+@pytest.mark.parametrize("num_channels", [1, 2])
+def test_float_and_int16_stretch_agree(num_channels):
+    """Test that float32 samples stretch like their int16 equivalents."""
+    rng = np.random.default_rng(0)
+    samples = rng.uniform(-1, 1, (num_channels, 40000)).astype(np.float32)
+
+    float_processor = AudioStretch()
+    float_processor.num_channels = num_channels
+    float_processor.samples = samples
+    float_processor.stretch(1.3)
+
+    int16_processor = AudioStretch()
+    int16_processor.num_channels = num_channels
+    int16_processor._samples_int16 = (samples * 32767).astype(np.int16)
+    int16_processor.stretch(1.3)
+
+    assert float_processor.samples.dtype == np.float32
+    np.testing.assert_array_equal(
+        float_processor.samples,
+        int16_processor._samples_int16 * np.float32(1.0 / 32767.0),
+    )
+
+
+def test_stretch_float_file(tmp_path):
+    """Test that files decoded as float32 stretch through the pipeline."""
+    import soundfile as sf
+    from pedalboard.io import AudioFile
+
+    input_path = tmp_path / "float.wav"
+    piped_path = tmp_path / "piped.wav"
+    expected_path = tmp_path / "expected.wav"
+    samples = np.random.default_rng(0).uniform(-0.5, 0.5, (44100, 2))
+    sf.write(input_path, samples.astype(np.float32), 44100, subtype="FLOAT")
+
+    stretch_audio(input_path, piped_path, ratio=1.3)
+
+    processor = AudioStretch()
+    processor.open(input_path)
+    assert processor.samples.dtype == np.float32
+    processor.stretch(1.3)
+    processor.save(expected_path)
+
+    with AudioFile(str(piped_path)) as piped, AudioFile(str(expected_path)) as expected:
+        assert abs(piped.frames - 1.3 * 44100) < 0.05 * 44100
+        np.testing.assert_array_equal(
+            piped.read(piped.frames), expected.read(expected.frames)
+        )
+
 
 def test_stretch_audio_function():
     """Test the stretch_audio convenience function."""
@@ -0,0 +1,156 @@
+# this_file: tests/test_wrapper.py
+"""
+Tests for the ctypes wrapper around the audio-stretch C library.
+"""
+
+import numpy as np
+import pytest
+
+from audiostretchy.c_interface import TDHSAudioStretch, wrapper
+
+
+def _sine_int16(num_frames, num_chans):
+    """Generate an interleaved int16 sine wave."""
+    mono = (np.sin(np.arange(num_frames) / 20.0) * 10000).astype(np.int16)
+    return np.ascontiguousarray(np.repeat(mono, num_chans))
+
+
+def _stretch_in_one_call(samples, num_chans, ratio):
+    """Stretch samples with a single process_samples call plus flush."""
+    stretcher = TDHSAudioStretch(132, 801, num_chans, 0)
+    num_frames = len(samples) // num_chans
+    capacity = stretcher.output_capacity(num_frames, ratio)
+
+    output = np.zeros(capacity * num_chans, dtype=np.int16)
+    num_processed = stretcher.process_samples(samples, num_frames, output, ratio)
+    flush_output = np.zeros(capacity * num_chans, dtype=np.int16)
+    num_flushed = stretcher.flush(flush_output)
+    stretcher.deinit()
+
+    return np.concatenate([
+        output[:num_processed * num_chans],
+        flush_output[:num_flushed * num_chans],
+    ])
+
+
+@pytest.mark.parametrize("num_chans", [1, 2])
+def test_process_stream_matches_single_call(num_chans):
+    """Test that chunked streaming produces the same output as one call."""
+    samples = _sine_int16(44100, num_chans)
+
+    expected = _stretch_in_one_call(samples, num_chans, 1.5)
+
+    stretcher = TDHSAudioStretch(132, 801, num_chans, 0)
+    result = stretcher.process_stream(samples, 1.5, chunk_size=256)
+    stretcher.deinit()
+
+    assert result.dtype == np.int16
+    np.testing.assert_array_equal(result, expected)
+
+
+def test_process_stream_flushes_dual_mode():
+    """Test that streaming in dual mode returns all buffered samples."""
+    samples = _sine_int16(44100, 1)
+
+    stretcher = TDHSAudioStretch(132, 801, 1, TDHSAudioStretch.STRETCH_DUAL_FLAG)
+    output = np.empty(stretcher.output_capacity(44100, 3.0), dtype=np.int16)
+    num_output = stretcher.process_samples(samples, 44100, output, 3.0)
+    flush_output = np.empty(stretcher.flush_capacity(3.0), dtype=np.int16)
+    flushed = stretcher.flush(flush_output)
+    while flushed:
+        num_output += flushed
+        flushed = stretcher.flush(flush_output)
+    stretcher.deinit()
+
+    stretcher = TDHSAudioStretch(132, 801, 1, TDHSAudioStretch.STRETCH_DUAL_FLAG)
+    result = stretcher.process_stream(samples, 3.0, chunk_size=256)
+    stretcher.deinit()
+
+    assert len(result) == num_output
+    assert abs(len(result) - 3.0 * 44100) < 0.05 * 3.0 * 44100
+
+
+def test_library_is_shared_between_instances():
+    """Test that the C library is loaded once and shared by all stretchers."""
+    first = TDHSAudioStretch(132, 801, 1, 0)
+    second = TDHSAudioStretch(132, 801, 2, 0)
+
+    assert first._lib is second._lib
+    assert first.stretch_samples is second.stretch_samples
+
+    first.deinit()
+    second.deinit()
+
+
+def test_process_samples_rejects_invalid_buffers():
+    """Test that buffers the C library cannot use are rejected."""
+    stretcher = TDHSAudioStretch(132, 801, 1, 0)
+    output = np.zeros(stretcher.output_capacity(1000, 1.5), dtype=np.int16)
+
+    with pytest.raises(ValueError, match="samples must be a C-contiguous int16 array"):
+        stretcher.process_samples(np.zeros(1000, dtype=np.float32), 1000, output, 1.5)
+
+    with pytest.raises(ValueError, match="samples must be a C-contiguous int16 array"):
+        strided = np.zeros(2000, dtype=np.int16)[::2]
+        stretcher.process_samples(strided, 1000, output, 1.5)
+
+    with pytest.raises(ValueError, match="samples must be a C-contiguous int16 array"):
+        stretcher.process_stream(np.zeros(1000, dtype=np.float32), 1.5)
+
+    with pytest.raises(ValueError, match="output must be a C-contiguous int16 array"):
+        stretcher.flush(output.astype(np.int32))
+
+    stretcher.deinit()
+
+
+def test_process_samples_inplace_reuses_buffer():
+    """Test that in-place processing returns views into one recycled buffer."""
+    samples = _sine_int16(4096, 2)
+    chunks = np.split(samples, 4)
+
+    stretcher = TDHSAudioStretch(132, 801, 2, 0)
+    first = stretcher.process_samples_inplace(chunks[0], 1.5)
+    buffer = stretcher._out_buf
+    outputs = [first.copy()]
+    for chunk in chunks[1:]:
+        result = stretcher.process_samples_inplace(chunk, 1.5)
+        assert result.base is buffer
+        outputs.append(result.copy())
+    stretcher.deinit()
+
+    reference = TDHSAudioStretch(132, 801, 2, 0)
+    output = np.zeros(reference.output_capacity(1024, 1.5) * 2, dtype=np.int16)
+    for chunk, result in zip(chunks, outputs):
+        produced = reference.process_samples(chunk, 1024, output, 1.5)
+        np.testing.assert_array_equal(result, output[:produced * 2])
+    reference.deinit()
+
+
+def test_cffi_module_is_preferred_when_built(monkeypatch):
+    """Test that the cffi extension module replaces the generic ctypes library."""
+    cffi_module = pytest.importorskip("audiostretchy.c_interface._audiostretch_cffi")
+    monkeypatch.setattr(wrapper, "_LIB", None)
+    monkeypatch.setattr(wrapper, "_simd_lib_path", lambda: None)
+
+    stretcher = TDHSAudioStretch(132, 801, 1, 0)
+    assert stretcher._lib is cffi_module.lib
+    assert stretcher.stretch_samples is cffi_module.lib.stretch_samples_addr
+
+    samples = _sine_int16(4096, 1)
+    output = np.zeros(stretcher.output_capacity(4096, 1.5), dtype=np.int16)
+    assert stretcher.process_samples(samples, 4096, output, 1.5) >= 0
+    stretcher.deinit()
+
+
+def test_simd_library_is_preferred_over_cffi(monkeypatch):
+    """Test that an AVX2 ctypes library the CPU can run wins over the cffi module."""
+    cffi_module = pytest.importorskip("audiostretchy.c_interface._audiostretch_cffi")
+    monkeypatch.setattr(wrapper, "_LIB", None)
+    monkeypatch.setattr(wrapper, "_audiostretch_cffi", cffi_module)
+    lib_path = wrapper._resolve_lib_path()
+    monkeypatch.setattr(wrapper, "_simd_lib_path", lambda: lib_path)
+
+    stretcher = TDHSAudioStretch(132, 801, 1, 0)
+    assert stretcher._lib is not cffi_module.lib
+    assert stretcher.stretch_samples is stretcher._lib.stretch_samples
+    stretcher.deinit()